@@ -5,27 +5,452 @@ Sistema de Caché para Google Maps Places API
 Optimiza el consumo de API almacenando resultados temporalmente
 """
 
+import os
 import json
+import logging
 import time
+import queue
+import atexit
 import hashlib
-from typing import Dict, List, Any, Optional
+import threading
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
+
+# Los mensajes por acierto/fallo van a DEBUG: sin coste salvo que se active ese nivel
+logger = logging.getLogger(__name__)
+
+# Extensión de archivo por formato de serialización
+SERIALIZER_EXTENSIONS = {
+    'json': '.json',
+    'msgpack': '.msgpack',
+}
+
+# Borrado en paralelo de archivos expirados
+UNLINK_PARALLEL_THRESHOLD = 64
+UNLINK_WORKERS = 16
+
+# Errores posibles al deserializar una entrada corrupta en cualquier formato
+# (orjson.JSONDecodeError y los errores de msgpack derivan de ValueError)
+DECODE_ERRORS = (ValueError,)
+
+class FileCacheBackend:
+    """Almacenamiento de caché en archivos locales (uno por clave)
+    
+    Las escrituras se encolan y las realiza un hilo en segundo plano
+    (archivo temporal + os.replace), de modo que ``set`` retorna de inmediato.
+    Con ``max_bytes`` el directorio queda acotado: al superarlo se eliminan
+    primero las entradas con menos aciertos y, entre ellas, las más antiguas.
+    
+    El mtime de cada archivo es su expiración definitiva; ``get`` con ``min_ttl``
+    exige además que le quede al menos ese margen de vida (entrada vigente).
+    """
+    
+    name = "file"
+    
+    def __init__(self, cache_dir: Path, max_bytes: Optional[int] = None,
+                 extension: str = ".json"):
+        """
+        Inicializa el almacenamiento en archivos
+        
+        Args:
+            cache_dir: Directorio para almacenar archivos de caché
+            max_bytes: Tamaño máximo del directorio en bytes (None = sin límite)
+            extension: Extensión de los archivos según el formato de serialización
+        """
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(exist_ok=True)
+        self.extension = extension
+        self.max_bytes = max_bytes
+        
+        # Índice para desalojo por capacidad: aciertos por clave y
+        # clave -> (bytes, expira_en), cargado del directorio al primer uso
+        self._hits: Dict[str, int] = {}
+        self._sizes: Optional[Dict[str, Tuple[int, float]]] = None
+        self._total_bytes = 0
+        
+        # Escrituras pendientes: clave -> (contenido, expira_en)
+        self._pending: Dict[str, Tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+        self._write_q: "queue.Queue[str]" = queue.Queue()
+        self._writer = threading.Thread(target=self._drain, daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+    
+    def _get_cache_file_path(self, key: str) -> Path:
+        """
+        Obtiene la ruta del archivo de caché
+        
+        Args:
+            key: Clave del caché (incluye el tipo: search_, details_)
+            
+        Returns:
+            Ruta del archivo de caché
+        """
+        return self.cache_dir / f"{key}{self.extension}"
+    
+    def _is_fresh(self, st: os.stat_result, min_ttl: int = 0) -> bool:
+        """
+        Verifica si un archivo sigue vigente a partir de su stat
+        
+        El mtime de cada archivo se fija al momento de expiración al escribirlo.
+        
+        Args:
+            st: Resultado de stat del archivo
+            min_ttl: Segundos de vida que aún le deben quedar
+            
+        Returns:
+            True si el caché es válido
+        """
+        return st.st_mtime - min_ttl > time.time()
+    
+    def get(self, key: str, min_ttl: int = 0) -> Optional[bytes]:
+        """Obtiene el contenido de una clave o None si no existe o le quedan menos de ``min_ttl`` segundos"""
+        with self._lock:
+            pending = self._pending.get(key)
+        if pending is not None:
+            return pending[0] if pending[1] - min_ttl > time.time() else None
+        
+        # Un solo open + fstat sobre el descriptor en lugar de exists + stat + open
+        try:
+            with open(self._get_cache_file_path(key), 'rb') as f:
+                if not self._is_fresh(os.fstat(f.fileno()), min_ttl):
+                    return None
+                payload = f.read()
+        except FileNotFoundError:
+            return None
+        
+        with self._lock:
+            self._hits[key] = self._hits.get(key, 0) + 1
+        return payload
+    
+    def set(self, key: str, payload: bytes, ttl: int) -> None:
+        """Encola el contenido de una clave con expiración ``ttl`` segundos (en el mtime)"""
+        with self._lock:
+            self._pending[key] = (payload, time.time() + ttl)
+        self._write_q.put(key)
+    
+    def _drain(self) -> None:
+        """Hilo escritor: vuelca a disco las escrituras encoladas"""
+        while True:
+            key = self._write_q.get()
+            try:
+                with self._lock:
+                    item = self._pending.get(key)
+                
+                # Varias escrituras de la misma clave se combinan en la última
+                if item is not None:
+                    self._write_file(key, *item)
+                    with self._lock:
+                        if self._pending.get(key) is item:
+                            del self._pending[key]
+                    self._enforce_capacity()
+            except Exception as e:
+                logger.warning("⚠️ Error guardando caché: %s", e)
+            finally:
+                self._write_q.task_done()
+    
+    def _write_file(self, key: str, payload: bytes, expires_at: float) -> None:
+        """
+        Escribe un archivo de caché de forma atómica
+        
+        Args:
+            key: Clave del caché
+            payload: Contenido serializado
+            expires_at: Momento de expiración, guardado como mtime
+        """
+        cache_file = self._get_cache_file_path(key)
+        tmp_file = cache_file.with_suffix('.tmp')
+        tmp_file.write_bytes(payload)
+        os.utime(tmp_file, (time.time(), expires_at))
+        os.replace(tmp_file, cache_file)
+        
+        with self._lock:
+            if self._sizes is not None:
+                self._forget(key)
+                self._sizes[key] = (len(payload), expires_at)
+                self._total_bytes += len(payload)
+    
+    def _forget(self, key: str) -> None:
+        """Quita una clave del índice de tamaños (requiere el lock)"""
+        size_entry = self._sizes.pop(key, None)
+        if size_entry is not None:
+            self._total_bytes -= size_entry[0]
+    
+    def _enforce_capacity(self) -> None:
+        """Elimina entradas poco usadas hasta quedar por debajo de ``max_bytes``"""
+        if self.max_bytes is None:
+            return
+        
+        with self._lock:
+            if self._sizes is None:
+                self._sizes = {}
+                self._total_bytes = 0
+                for entry in self._scan():
+                    st = entry.stat(follow_symlinks=False)
+                    self._sizes[self._entry_key(entry)] = (st.st_size, st.st_mtime)
+                    self._total_bytes += st.st_size
+            
+            if self._total_bytes <= self.max_bytes:
+                return
+            
+            # Menos aciertos primero; a igualdad, la que expira antes
+            victims = sorted(
+                self._sizes,
+                key=lambda k: (self._hits.get(k, 0), self._sizes[k][1])
+            )
+            
+            for key in victims:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(self._get_cache_file_path(key))
+                except FileNotFoundError:
+                    pass
+                self._forget(key)
+                self._hits.pop(key, None)
+    
+    def touch(self, key: str, ttl: int) -> bool:
+        """Renueva la expiración de una clave sin reescribirla; False si no existe"""
+        expires_at = time.time() + ttl
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                self._pending[key] = (pending[0], expires_at)
+                return True
+        
+        try:
+            os.utime(self._get_cache_file_path(key), (time.time(), expires_at))
+            return True
+        except FileNotFoundError:
+            return False
+    
+    def flush(self) -> None:
+        """Espera a que se completen todas las escrituras pendientes"""
+        self._write_q.join()
+    
+    def _scan(self):
+        """Recorre los archivos de caché con os.scandir (un stat por entrada)"""
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(self.extension):
+                    yield entry
+    
+    def _entry_key(self, entry: os.DirEntry) -> str:
+        """Obtiene la clave de caché a partir de una entrada del directorio"""
+        return entry.name[:-len(self.extension)]
+    
+    def _unlink(self, path: str) -> bool:
+        """Elimina un archivo; True si se eliminó"""
+        try:
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning("⚠️ Error eliminando caché: %s", e)
+            return False
+    
+    def clear_expired(self) -> int:
+        """Elimina archivos expirados y retorna cuántos se eliminaron"""
+        self.flush()
+        now = time.time()
+        
+        expired = [
+            entry for entry in self._scan()
+            if entry.stat(follow_symlinks=False).st_mtime <= now
+        ]
+        
+        # unlink libera el GIL: con muchos archivos los borrados se solapan en hilos
+        if len(expired) >= UNLINK_PARALLEL_THRESHOLD:
+            with ThreadPoolExecutor(max_workers=UNLINK_WORKERS) as executor:
+                results = list(executor.map(self._unlink, (e.path for e in expired)))
+        else:
+            results = [self._unlink(e.path) for e in expired]
+        
+        with self._lock:
+            for entry, deleted in zip(expired, results):
+                if deleted:
+                    if self._sizes is not None:
+                        self._forget(self._entry_key(entry))
+                    self._hits.pop(self._entry_key(entry), None)
+        
+        return sum(results)
+    
+    def clear(self) -> None:
+        """Elimina todos los archivos de caché"""
+        self.flush()
+        for entry in self._scan():
+            os.unlink(entry.path)
+        
+        with self._lock:
+            self._hits.clear()
+            self._sizes = None
+            self._total_bytes = 0
+    
+    def size(self) -> Dict[str, int]:
+        """Retorna número de entradas y bytes ocupados"""
+        self.flush()
+        total_size = 0
+        file_count = 0
+        
+        for entry in self._scan():
+            total_size += entry.stat(follow_symlinks=False).st_size
+            file_count += 1
+        
+        return {'total_files': file_count, 'total_size_bytes': total_size}
+
+class RedisCacheBackend:
+    """Almacenamiento de caché en Redis (compartido entre procesos, expiración por TTL)
+    
+    Todos los workers comparten los aciertos. Para acotar memoria conviene
+    configurar el servidor con ``maxmemory`` y ``maxmemory-policy allkeys-lfu``:
+    así se desalojan primero los lugares menos consultados.
+    """
+    
+    name = "redis"
+    
+    def __init__(self, redis_url: str, prefix: str = "api_cache:", max_connections: int = 32):
+        """
+        Inicializa la conexión a Redis
+        
+        Args:
+            redis_url: URL de Redis (redis://host:port/db o unix:///ruta/redis.sock)
+            prefix: Prefijo de las claves para no mezclar con otros datos
+            max_connections: Conexiones máximas del pool compartido entre hilos
+        """
+        import redis
+        
+        self._errors = redis.RedisError
+        pool = redis.ConnectionPool.from_url(redis_url, max_connections=max_connections)
+        self.client = redis.Redis(connection_pool=pool)
+        self.prefix = prefix
+    
+    def get(self, key: str, min_ttl: int = 0) -> Optional[bytes]:
+        """Obtiene el contenido de una clave o None si no existe o le quedan menos de ``min_ttl`` segundos"""
+        key = self.prefix + key
+        try:
+            if not min_ttl:
+                return self.client.get(key)
+            with self.client.pipeline(transaction=False) as pipe:
+                payload, pttl = pipe.get(key).pttl(key).execute()
+        except self._errors as e:
+            logger.warning("⚠️ Error leyendo caché Redis: %s", e)
+            return None
+        
+        # PTTL -1: clave sin expiración
+        if payload is not None and 0 <= pttl <= min_ttl * 1000:
+            return None
+        return payload
+    
+    def set(self, key: str, payload: bytes, ttl: int) -> None:
+        """Almacena el contenido de una clave con expiración ``ttl`` segundos"""
+        self.client.set(self.prefix + key, payload, ex=ttl)
+    
+    def touch(self, key: str, ttl: int) -> bool:
+        """Renueva la expiración de una clave sin reescribirla; False si no existe"""
+        return bool(self.client.expire(self.prefix + key, ttl))
+    
+    def clear_expired(self) -> int:
+        """Redis expira las claves por TTL; no hay nada que limpiar"""
+        return 0
+    
+    def clear(self) -> None:
+        """Elimina todas las claves del caché"""
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+    
+    def size(self) -> Dict[str, int]:
+        """Retorna número de entradas y bytes ocupados (MEMORY USAGE)"""
+        total_size = 0
+        key_count = 0
+        
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            total_size += self.client.memory_usage(key) or 0
+            key_count += 1
+        
+        return {'total_files': key_count, 'total_size_bytes': total_size}
 
 class APICache:
     """Sistema de caché para optimizar llamadas a Google Maps API"""
     
-    def __init__(self, duration: int = 3600, cache_dir: str = "cache"):
+    # Atributos en slots: los contadores se incrementan en cada consulta
+    __slots__ = (
+        'duration', 'details_duration', 'nearby_duration', 'stale_duration', 'cache_dir',
+        'max_bytes', 'serializer',
+        'debug', 'file_extension', 'backend', 'hits', 'misses', 'total_requests',
+        '_dump_options', '_msgpack', '_mem', '_mem_cap', '_lock',
+    )
+    
+    def __init__(self, duration: int = 3600, cache_dir: str = "cache", debug: bool = False,
+                 details_duration: int = 86400 * 7, redis_url: Optional[str] = None,
+                 memory_size: int = 1024, nearby_duration: int = 300,
+                 max_bytes: Optional[int] = None, serializer: str = "msgpack",
+                 stale_duration: int = 86400):
         """
         Inicializa el sistema de caché
         
         Args:
             duration: Duración del caché en segundos (default: 1 hora)
             cache_dir: Directorio para almacenar archivos de caché
+            debug: Escribe las entradas JSON indentadas para inspección manual
+            details_duration: Duración en segundos de los detalles de lugares
+                (default: 7 días; cambian mucho menos que los resultados de búsqueda)
+            redis_url: URL de Redis; si no se indica se usa REDIS_URL del entorno
+                y, si tampoco existe, archivos locales en ``cache_dir``
+            memory_size: Entradas máximas del caché LRU en memoria (0 lo desactiva)
+            nearby_duration: Duración en segundos de las búsquedas cercanas
+                (default: 5 minutos; dependen más de lo que está abierto ahora)
+            max_bytes: Tamaño máximo del caché en disco (None = sin límite);
+                con Redis el límite lo impone su propia política maxmemory
+            serializer: Formato de las entradas: 'msgpack' (default) o 'json'; ninguno
+                ejecuta código al leer, así que un caché compartido no es un riesgo
+            stale_duration: Segundos que una entrada vencida se conserva como respaldo
+                si la API falla (default: 1 día; 0 lo desactiva)
         """
+        if serializer not in SERIALIZER_EXTENSIONS:
+            raise ValueError(f"Serializador no soportado: {serializer}")
+        
         self.duration = duration
+        self.details_duration = details_duration
+        self.nearby_duration = nearby_duration
+        self.stale_duration = stale_duration
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(exist_ok=True)
+        self.max_bytes = max_bytes
+        self.serializer = serializer
+        self.debug = debug
+        self.file_extension = SERIALIZER_EXTENSIONS[serializer]
+        
+        # Opciones de serialización (indentado solo en modo debug)
+        self._dump_options = orjson.OPT_NON_STR_KEYS
+        if debug:
+            self._dump_options |= orjson.OPT_INDENT_2
+        
+        if serializer == 'msgpack':
+            import msgpack
+            self._msgpack = msgpack
+        
+        redis_url = redis_url or os.getenv('REDIS_URL')
+        if redis_url:
+            self.backend = RedisCacheBackend(redis_url)
+        else:
+            self.backend = FileCacheBackend(self.cache_dir, max_bytes, self.file_extension)
+        
+        # Caché LRU en memoria delante del backend:
+        # clave -> (vigente_hasta, expira_definitivamente_en, valor, huella)
+        # La huella del último contenido escrito permite omitir reescrituras;
+        # al vivir en la entrada se desaloja junto con ella
+        self._mem: "OrderedDict[str, Tuple[float, float, Any, Optional[bytes]]]" = OrderedDict()
+        self._mem_cap = memory_size
+        
+        # El cliente consulta el caché desde varios hilos: el LRU y los
+        # contadores solo se modifican con este lock tomado
+        self._lock = threading.Lock()
         
         # Estadísticas
         self.hits = 0
@@ -44,51 +469,206 @@ class APICache:
         Returns:
             Clave de caché única
         """
-        # Crear string único con todos los parámetros
-        params = {
-            'query': query,
-            'location': location,
-            **kwargs
-        }
+        # Sin parámetros extra: un solo update, misma clave que el caso general
+        if not kwargs:
+            return hashlib.blake2b(
+                f"{query}\0{location or ''}\0".encode(), digest_size=16
+            ).hexdigest()
+        
+        # Forma canónica en bytes (sin dict intermedio ni json.dumps)
+        h = hashlib.blake2b(digest_size=16)
+        h.update(query.encode())
+        h.update(b'\0')
+        h.update((location or '').encode())
+        h.update(b'\0')
         
         # Ordenar parámetros para consistencia
-        sorted_params = sorted(params.items())
-        param_string = json.dumps(sorted_params, sort_keys=True)
+        for k in sorted(kwargs):
+            h.update(k.encode())
+            h.update(b'=')
+            h.update(str(kwargs[k]).encode())
+            h.update(b'&')
         
-        # Generar hash MD5
-        return hashlib.md5(param_string.encode()).hexdigest()
+        return h.hexdigest()
     
-    def _get_cache_file_path(self, cache_key: str, cache_type: str) -> Path:
+    def _make_key(self, cache_key: str, cache_type: str) -> str:
         """
-        Obtiene la ruta del archivo de caché
+        Construye la clave de almacenamiento
         
         Args:
             cache_key: Clave del caché
             cache_type: Tipo de caché (search, details)
             
         Returns:
-            Ruta del archivo de caché
+            Clave con el tipo como prefijo
         """
-        return self.cache_dir / f"{cache_type}_{cache_key}.json"
+        return f"{cache_type}_{cache_key}"
     
-    def _is_cache_valid(self, cache_file: Path) -> bool:
+    def _mem_get(self, key: str) -> Optional[Any]:
         """
-        Verifica si el caché es válido (no expirado)
+        Busca una entrada vigente en el caché en memoria
         
         Args:
-            cache_file: Archivo de caché
+            key: Clave de almacenamiento
             
         Returns:
-            True si el caché es válido
+            Valor almacenado o None si no existe o expiró
         """
-        if not cache_file.exists():
-            return False
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is None:
+                return None
+            
+            now = time.time()
+            if entry[0] <= now:
+                # Vencida: se conserva como respaldo hasta su expiración definitiva
+                if entry[1] <= now:
+                    del self._mem[key]
+                return None
+            
+            self._mem.move_to_end(key)
+            return entry[2]
+    
+    def _mem_set(self, key: str, value: Any, expires_at: float,
+                 digest: Optional[bytes] = None) -> None:
+        """
+        Inserta una entrada en el caché en memoria, desalojando la menos usada
+        
+        Args:
+            key: Clave de almacenamiento
+            value: Valor a recordar
+            expires_at: Momento de expiración (epoch en segundos); se conserva
+                como respaldo ``stale_duration`` segundos más
+            digest: Huella del contenido escrito en el backend (si se conoce)
+        """
+        if self._mem_cap <= 0:
+            return
+        
+        with self._lock:
+            self._mem[key] = (expires_at, expires_at + self.stale_duration, value, digest)
+            self._mem.move_to_end(key)
+            
+            if len(self._mem) > self._mem_cap:
+                self._mem.popitem(last=False)
+    
+    def _count(self, hit: bool) -> None:
+        """
+        Registra una consulta en las estadísticas
         
-        # Verificar tiempo de modificación
-        file_time = datetime.fromtimestamp(cache_file.stat().st_mtime)
-        expiry_time = file_time + timedelta(seconds=self.duration)
+        Args:
+            hit: True si se encontró en el caché
+        """
+        with self._lock:
+            self.total_requests += 1
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+    
+    def _entry_expiry(self, data: Dict[str, Any], ttl: int) -> float:
+        """
+        Obtiene el momento de expiración de una entrada leída del backend
+        
+        Args:
+            data: Entrada deserializada
+            ttl: Duración del tipo de entrada, si no trae expiración vigente
+            
+        Returns:
+            Momento de expiración (epoch en segundos)
+        """
+        expires_at = data.get('expires_at')
+        now = time.time()
+        if isinstance(expires_at, (int, float)) and expires_at > now:
+            return expires_at
         
-        return datetime.now() < expiry_time
+        # Entradas antiguas con fechas ISO o renovadas con touch()
+        return now + ttl
+    
+    def _remember(self, key: str, value: Any, expires_at: float, ttl: int,
+                  content: Any) -> bool:
+        """
+        Guarda una entrada en memoria y renueva la del backend si su contenido no cambió
+        
+        Solo se detecta si la última escritura de la clave sigue en el LRU en memoria.
+        
+        Args:
+            key: Clave de almacenamiento
+            value: Valor a recordar en memoria
+            expires_at: Momento de expiración (epoch en segundos)
+            ttl: Nueva duración en segundos (sin contar el margen de respaldo)
+            content: Contenido que identifica la entrada (p. ej. resultados + ETag)
+            
+        Returns:
+            True si la entrada ya existía con el mismo contenido y se renovó
+        """
+        try:
+            digest = hashlib.blake2b(
+                orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS), digest_size=8
+            ).digest()
+        except TypeError:
+            digest = None  # No serializable: se recuerda igual, sin omitir la escritura
+        
+        with self._lock:
+            entry = self._mem.get(key)
+        previous = entry[3] if entry is not None else None
+        
+        self._mem_set(key, value, expires_at, digest)
+        return (digest is not None and previous == digest and
+                self.backend.touch(key, ttl + self.stale_duration))
+    
+    def _decode(self, payload: bytes) -> Dict[str, Any]:
+        """
+        Deserializa una entrada de caché
+        
+        Args:
+            payload: Contenido almacenado
+            
+        Returns:
+            Entrada deserializada
+        """
+        if self.serializer == 'msgpack':
+            return self._msgpack.unpackb(payload, raw=False)
+        return self._decode_json(payload)
+    
+    def _decode_json(self, payload: bytes) -> Dict[str, Any]:
+        """
+        Deserializa una entrada en formato JSON
+        
+        Args:
+            payload: Contenido almacenado
+            
+        Returns:
+            Entrada deserializada
+        """
+        try:
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            # Archivos antiguos escritos con json estándar (p. ej. NaN)
+            return json.loads(payload.decode('utf-8'))
+    
+    def _encode(self, cache_data: Dict[str, Any]) -> bytes:
+        """
+        Serializa una entrada de caché
+        
+        Args:
+            cache_data: Datos a almacenar
+            
+        Returns:
+            Contenido serializado
+        """
+        if self.serializer == 'msgpack':
+            return self._msgpack.packb(cache_data, use_bin_type=True)
+        return orjson.dumps(cache_data, option=self._dump_options)
+    
+    def _add_readable_dates(self, cache_data: Dict[str, Any]) -> None:
+        """
+        Agrega fechas ISO legibles a una entrada (solo en modo debug)
+        
+        Args:
+            cache_data: Entrada con cached_at/expires_at en epoch
+        """
+        cache_data['cached_at_iso'] = datetime.fromtimestamp(cache_data['cached_at']).isoformat()
+        cache_data['expires_at_iso'] = datetime.fromtimestamp(cache_data['expires_at']).isoformat()
     
     def get_search_results(self, query: str, location: str = None, **kwargs) -> Optional[List[Dict[str, Any]]]:
         """
@@ -102,53 +682,235 @@ class APICache:
         Returns:
             Resultados del caché o None si no existe
         """
-        self.total_requests += 1
+        key = self._make_key(self._generate_cache_key(query, location, **kwargs), "search")
+        return self._get_results(key, self.duration, query)
+    
+    def set_search_results(self, query: str, results: List[Dict[str, Any]], 
+                          location: str = None, etag: Optional[str] = None, **kwargs) -> None:
+        """
+        Almacena resultados de búsqueda en el caché
+        
+        Args:
+            query: Consulta de búsqueda
+            results: Resultados a almacenar
+            location: Ubicación
+            etag: ETag de la respuesta, para revalidarla después con If-None-Match
+            **kwargs: Parámetros adicionales
+        """
+        key = self._make_key(self._generate_cache_key(query, location, **kwargs), "search")
+        self._set_results(key, query, location, results, self.duration, etag)
+    
+    def get_search_etag(self, query: str, location: str = None, **kwargs) -> Optional[str]:
+        """
+        Obtiene el ETag guardado de una búsqueda, vigente o vencida
+        
+        Args:
+            query: Consulta de búsqueda
+            location: Ubicación
+            **kwargs: Parámetros adicionales
+            
+        Returns:
+            ETag de la última respuesta o None si no hay
+        """
+        key = self._make_key(self._generate_cache_key(query, location, **kwargs), "search")
+        data = self._read_entry(key)
+        return data.get('etag') if data else None
+    
+    def revalidate_search_results(self, query: str, location: str = None,
+                                  **kwargs) -> Optional[List[Dict[str, Any]]]:
+        """
+        Renueva la vigencia de una búsqueda que la API confirmó sin cambios (HTTP 304)
+        
+        Args:
+            query: Consulta de búsqueda
+            location: Ubicación
+            **kwargs: Parámetros adicionales
+            
+        Returns:
+            Resultados renovados o None si la entrada ya no existe
+        """
+        key = self._make_key(self._generate_cache_key(query, location, **kwargs), "search")
+        results = self._get_stale(key, 'results', query)
+        if results is None or not self.backend.touch(key, self.duration + self.stale_duration):
+            return None
+        
+        self._mem_set(key, results, time.time() + self.duration)
+        return results
+    
+    def get_search_results_stale(self, query: str, location: str = None,
+                                 **kwargs) -> Optional[List[Dict[str, Any]]]:
+        """
+        Obtiene resultados de búsqueda aunque estén vencidos (respaldo si la API falla)
+        
+        Args:
+            query: Consulta de búsqueda
+            location: Ubicación
+            **kwargs: Parámetros adicionales
+            
+        Returns:
+            Resultados del caché o None si ya expiraron definitivamente
+        """
+        key = self._make_key(self._generate_cache_key(query, location, **kwargs), "search")
+        return self._get_stale(key, 'results', query)
+    
+    def get_nearby_results(self, location: str, **kwargs) -> Optional[List[Dict[str, Any]]]:
+        """
+        Obtiene resultados de una búsqueda cercana (Nearby Search) del caché
+        
+        Args:
+            location: Coordenadas (lat,lng)
+            **kwargs: Parámetros adicionales (radio, tipo, palabra clave)
+            
+        Returns:
+            Resultados del caché o None si no existe
+        """
+        key = self._make_key(self._generate_cache_key('', location, **kwargs), "nearby")
+        return self._get_results(key, self.nearby_duration, location)
+    
+    def set_nearby_results(self, location: str, results: List[Dict[str, Any]], **kwargs) -> None:
+        """
+        Almacena resultados de una búsqueda cercana en el caché
+        
+        Args:
+            location: Coordenadas (lat,lng)
+            results: Resultados a almacenar
+            **kwargs: Parámetros adicionales (radio, tipo, palabra clave)
+        """
+        key = self._make_key(self._generate_cache_key('', location, **kwargs), "nearby")
+        self._set_results(key, '', location, results, self.nearby_duration)
+    
+    def get_nearby_results_stale(self, location: str, **kwargs) -> Optional[List[Dict[str, Any]]]:
+        """
+        Obtiene resultados de una búsqueda cercana aunque estén vencidos
+        
+        Args:
+            location: Coordenadas (lat,lng)
+            **kwargs: Parámetros adicionales (radio, tipo, palabra clave)
+            
+        Returns:
+            Resultados del caché o None si ya expiraron definitivamente
+        """
+        key = self._make_key(self._generate_cache_key('', location, **kwargs), "nearby")
+        return self._get_stale(key, 'results', location)
+    
+    def _get_results(self, key: str, ttl: int, label: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Busca una lista de resultados en memoria y, si no está, en el backend
+        
+        Args:
+            key: Clave de almacenamiento
+            ttl: Duración del tipo de entrada
+            label: Texto para los mensajes de depuración
+            
+        Returns:
+            Resultados del caché o None si no existe
+        """
+        results = self._mem_get(key)
+        if results is not None:
+            self._count(True)
+            logger.debug("💾 Caché HIT para: '%s'", label)
+            return results
         
-        cache_key = self._generate_cache_key(query, location, **kwargs)
-        cache_file = self._get_cache_file_path(cache_key, "search")
+        payload = self.backend.get(key, self.stale_duration)
         
-        if self._is_cache_valid(cache_file):
+        if payload is not None:
             try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.hits += 1
-                    print(f"💾 Caché HIT para: '{query}'")
-                    return data.get('results', [])
-            except (json.JSONDecodeError, FileNotFoundError):
+                data = self._decode(payload)
+                results = data.get('results', [])
+                self._mem_set(key, results, self._entry_expiry(data, ttl))
+                self._count(True)
+                logger.debug("💾 Caché HIT para: '%s'", label)
+                return results
+            except DECODE_ERRORS:
                 pass
         
-        self.misses += 1
-        print(f"🔍 Caché MISS para: '{query}'")
+        self._count(False)
+        logger.debug("🔍 Caché MISS para: '%s'", label)
         return None
     
-    def set_search_results(self, query: str, results: List[Dict[str, Any]], 
-                          location: str = None, **kwargs) -> None:
+    def _get_stale(self, key: str, field: str, label: str) -> Optional[Any]:
         """
-        Almacena resultados de búsqueda en el caché
+        Busca una entrada vencida que aún no expiró definitivamente
+        
+        No cuenta en las estadísticas: solo se consulta tras un MISS
+        cuya petición a la API falló.
+        
+        Args:
+            key: Clave de almacenamiento
+            field: Campo del valor en la entrada ('results' o 'details')
+            label: Texto para los mensajes de depuración
+            
+        Returns:
+            Valor almacenado o None si no existe
+        """
+        with self._lock:
+            entry = self._mem.get(key)
+        if entry is not None and entry[1] > time.time():
+            logger.debug("♻️ Caché STALE para: '%s'", label)
+            return entry[2]
+        
+        data = self._read_entry(key)
+        if data is None:
+            return None
+        
+        logger.debug("♻️ Caché STALE para: '%s'", label)
+        return data.get(field)
+    
+    def _read_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Lee y deserializa una entrada del backend, vigente o vencida
+        
+        Args:
+            key: Clave de almacenamiento
+            
+        Returns:
+            Entrada deserializada o None si no existe o está corrupta
+        """
+        payload = self.backend.get(key)
+        if payload is None:
+            return None
+        
+        try:
+            return self._decode(payload)
+        except DECODE_ERRORS:
+            return None
+    
+    def _set_results(self, key: str, query: str, location: Optional[str],
+                     results: List[Dict[str, Any]], ttl: int, etag: Optional[str] = None) -> None:
+        """
+        Almacena una lista de resultados en memoria y en el backend
         
         Args:
+            key: Clave de almacenamiento
             query: Consulta de búsqueda
-            results: Resultados a almacenar
             location: Ubicación
-            **kwargs: Parámetros adicionales
+            results: Resultados a almacenar
+            ttl: Duración en segundos
+            etag: ETag de la respuesta (opcional)
         """
-        cache_key = self._generate_cache_key(query, location, **kwargs)
-        cache_file = self._get_cache_file_path(cache_key, "search")
-        
+        now = time.time()
         cache_data = {
             'query': query,
             'location': location,
             'results': results,
-            'cached_at': datetime.now().isoformat(),
-            'expires_at': (datetime.now() + timedelta(seconds=self.duration)).isoformat()
+            'cached_at': now,
+            'expires_at': now + ttl
         }
+        if etag:
+            cache_data['etag'] = etag
+        if self.debug:
+            self._add_readable_dates(cache_data)
         
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
-            print(f"💾 Resultados almacenados en caché: {len(results)} lugares")
+            # Con otro ETag hay que reescribir la entrada aunque los resultados coincidan
+            if self._remember(key, results, cache_data['expires_at'], ttl,
+                              (results, etag) if etag else results):
+                logger.debug("💾 Resultados sin cambios, caché renovado: %d lugares", len(results))
+                return
+            self.backend.set(key, self._encode(cache_data), ttl + self.stale_duration)
+            logger.debug("💾 Resultados almacenados en caché: %d lugares", len(results))
         except Exception as e:
-            print(f"⚠️ Error guardando caché: {e}")
+            logger.warning("⚠️ Error guardando caché: %s", e)
     
     def get_place_details(self, place_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -160,23 +922,29 @@ class APICache:
         Returns:
             Detalles del lugar o None si no existe
         """
-        self.total_requests += 1
+        key = self._make_key(place_id, "details")
+        
+        details = self._mem_get(key)
+        if details is not None:
+            self._count(True)
+            logger.debug("💾 Caché HIT para lugar: %.20s...", place_id)
+            return details
         
-        cache_key = place_id
-        cache_file = self._get_cache_file_path(cache_key, "details")
+        payload = self.backend.get(key, self.stale_duration)
         
-        if self._is_cache_valid(cache_file):
+        if payload is not None:
             try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.hits += 1
-                    print(f"💾 Caché HIT para lugar: {place_id[:20]}...")
-                    return data.get('details')
-            except (json.JSONDecodeError, FileNotFoundError):
+                data = self._decode(payload)
+                details = data.get('details')
+                self._mem_set(key, details, self._entry_expiry(data, self.details_duration))
+                self._count(True)
+                logger.debug("💾 Caché HIT para lugar: %.20s...", place_id)
+                return details
+            except DECODE_ERRORS:
                 pass
         
-        self.misses += 1
-        print(f"🔍 Caché MISS para lugar: {place_id[:20]}...")
+        self._count(False)
+        logger.debug("🔍 Caché MISS para lugar: %.20s...", place_id)
         return None
     
     def set_place_details(self, place_id: str, details: Any) -> None:
@@ -185,45 +953,51 @@ class APICache:
         
         Args:
             place_id: ID del lugar
-            details: Detalles del lugar (PlaceDetails object)
-        """
-        cache_key = place_id
-        cache_file = self._get_cache_file_path(cache_key, "details")
-        
-        # Convertir PlaceDetails a diccionario serializable
-        if hasattr(details, '__dict__'):
-            details_dict = {
-                'place_id': details.place_id,
-                'name': details.name,
-                'address': details.address,
-                'rating': details.rating,
-                'price_level': details.price_level,
-                'types': details.types,
-                'photos': details.photos,
-                'phone_number': details.phone_number,
-                'website': details.website,
-                'opening_hours': details.opening_hours,
-                'reviews': details.reviews,
-                'geometry': details.geometry,
-                'formatted_address': details.formatted_address,
-                'business_status': details.business_status
-            }
+            details: Detalles del lugar (PlaceDetails o dict ya serializable)
+        """
+        # Convertir PlaceDetails a diccionario serializable (un dict se guarda tal cual)
+        if isinstance(details, dict):
+            details_dict = details
+        elif is_dataclass(details):
+            details_dict = asdict(details)
+        elif hasattr(details, '__dict__'):
+            details_dict = vars(details).copy()
         else:
             details_dict = details
         
+        now = time.time()
         cache_data = {
             'place_id': place_id,
             'details': details_dict,
-            'cached_at': datetime.now().isoformat(),
-            'expires_at': (datetime.now() + timedelta(seconds=self.duration)).isoformat()
+            'cached_at': now,
+            'expires_at': now + self.details_duration
         }
+        if self.debug:
+            self._add_readable_dates(cache_data)
         
+        key = self._make_key(place_id, "details")
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
-            print(f"💾 Detalles almacenados en caché: {place_id[:20]}...")
+            if self._remember(key, details_dict, cache_data['expires_at'],
+                              self.details_duration, details_dict):
+                logger.debug("💾 Detalles sin cambios, caché renovado: %.20s...", place_id)
+                return
+            self.backend.set(key, self._encode(cache_data),
+                             self.details_duration + self.stale_duration)
+            logger.debug("💾 Detalles almacenados en caché: %.20s...", place_id)
         except Exception as e:
-            print(f"⚠️ Error guardando caché: {e}")
+            logger.warning("⚠️ Error guardando caché: %s", e)
+    
+    def get_place_details_stale(self, place_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene detalles de un lugar aunque estén vencidos (respaldo si la API falla)
+        
+        Args:
+            place_id: ID del lugar
+            
+        Returns:
+            Detalles del lugar o None si ya expiraron definitivamente
+        """
+        return self._get_stale(self._make_key(place_id, "details"), 'details', place_id)
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """
@@ -232,7 +1006,7 @@ class APICache:
         Returns:
             Estadísticas del caché
         """
-        hit_rate = (self.hits / max(self.total_requests, 1)) * 100
+        hit_rate = self.hits * 100.0 / max(self.total_requests, 1)
         
         return {
             'total_requests': self.total_requests,
@@ -240,6 +1014,11 @@ class APICache:
             'cache_misses': self.misses,
             'hit_rate_percentage': round(hit_rate, 2),
             'cache_duration_seconds': self.duration,
+            'details_cache_duration_seconds': self.details_duration,
+            'nearby_cache_duration_seconds': self.nearby_duration,
+            'stale_cache_duration_seconds': self.stale_duration,
+            'cache_backend': self.backend.name,
+            'cache_max_bytes': self.max_bytes,
             'cache_directory': str(self.cache_dir)
         }
     
@@ -250,29 +1029,27 @@ class APICache:
         Returns:
             Número de archivos eliminados
         """
-        deleted_count = 0
+        now = time.time()
+        with self._lock:
+            for key in [k for k, entry in self._mem.items() if entry[1] <= now]:
+                del self._mem[key]
         
-        for cache_file in self.cache_dir.glob("*.json"):
-            if not self._is_cache_valid(cache_file):
-                try:
-                    cache_file.unlink()
-                    deleted_count += 1
-                except Exception as e:
-                    print(f"⚠️ Error eliminando caché: {e}")
+        deleted_count = self.backend.clear_expired()
         
         if deleted_count > 0:
-            print(f"🧹 Eliminados {deleted_count} archivos de caché expirados")
+            logger.info("🧹 Eliminados %d archivos de caché expirados", deleted_count)
         
         return deleted_count
     
     def clear_all_cache(self) -> None:
         """Limpia todo el caché"""
+        with self._lock:
+            self._mem.clear()
         try:
-            for cache_file in self.cache_dir.glob("*.json"):
-                cache_file.unlink()
-            print("🧹 Todo el caché ha sido limpiado")
+            self.backend.clear()
+            logger.info("🧹 Todo el caché ha sido limpiado")
         except Exception as e:
-            print(f"⚠️ Error limpiando caché: {e}")
+            logger.warning("⚠️ Error limpiando caché: %s", e)
     
     def get_cache_size(self) -> Dict[str, Any]:
         """
@@ -281,15 +1058,11 @@ class APICache:
         Returns:
             Información del tamaño del caché
         """
-        total_size = 0
-        file_count = 0
-        
-        for cache_file in self.cache_dir.glob("*.json"):
-            total_size += cache_file.stat().st_size
-            file_count += 1
+        size_info = self.backend.size()
+        total_size = size_info['total_size_bytes']
         
         return {
-            'total_files': file_count,
+            'total_files': size_info['total_files'],
             'total_size_bytes': total_size,
             'total_size_mb': round(total_size / (1024 * 1024), 2),
             'cache_directory': str(self.cache_dir)
@@ -300,6 +1073,8 @@ def main():
     print("💾 Sistema de Caché para Google Maps API")
     print("="*50)
     
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    
     # Crear instancia del caché
     cache = APICache(duration=1800)  # 30 minutos
     
@@ -22,7 +22,10 @@ class CacheManager:
     def __init__(self):
         """Inicializa el gestor de caché"""
         self.cache = APICache(
-            duration=Config.SEARCH_CONFIG.get('cache_duration', 3600)
+            duration=Config.SEARCH_CONFIG.get('cache_duration', 3600),
+            details_duration=Config.SEARCH_CONFIG.get('details_cache_duration', 86400 * 7),
+            max_bytes=Config.SEARCH_CONFIG.get('cache_max_bytes'),
+            stale_duration=Config.SEARCH_CONFIG.get('stale_cache_duration', 86400)
         )
     
     def show_cache_stats(self):
@@ -35,6 +38,8 @@ class CacheManager:
         
         print(f"📁 Directorio de caché: {stats.get('cache_directory', 'N/A')}")
         print(f"⏰ Duración del caché: {stats.get('cache_duration_seconds', 0)} segundos")
+        print(f"⏰ Duración de detalles: {stats.get('details_cache_duration_seconds', 0)} segundos")
+        print(f"♻️ Respaldo con entradas vencidas: {stats.get('stale_cache_duration_seconds', 0)} segundos")
         print(f"📊 Total de peticiones: {stats.get('total_requests', 0)}")
         print(f"✅ Aciertos de caché: {stats.get('cache_hits', 0)}")
         print(f"❌ Fallos de caché: {stats.get('cache_misses', 0)}")
@@ -74,7 +79,13 @@ class CacheManager:
             print("❌ Directorio de caché no existe")
             return
         
-        files = list(cache_dir.glob("*.json"))
+        # Un solo stat por entrada con os.scandir
+        with os.scandir(cache_dir) as it:
+            files = sorted(
+                (entry.name, entry.stat(follow_symlinks=False))
+                for entry in it
+                if entry.name.endswith(self.cache.file_extension)
+            )
         
         if not files:
             print("📭 No hay archivos de caché")
@@ -83,18 +94,22 @@ class CacheManager:
         print(f"📊 Total de archivos: {len(files)}")
         print("\n📋 Lista de archivos:")
         
-        for i, file_path in enumerate(files, 1):
-            file_size = file_path.stat().st_size
-            file_time = datetime.fromtimestamp(file_path.stat().st_mtime)
+        lines = []
+        for i, (name, st) in enumerate(files, 1):
+            # El mtime es la expiración definitiva (vigencia + margen de respaldo)
+            file_time = datetime.fromtimestamp(st.st_mtime - self.cache.stale_duration)
             
             # Determinar tipo de archivo
-            file_type = "🔍 Búsqueda" if "search_" in file_path.name else "📍 Detalles"
+            file_type = "🔍 Búsqueda" if name.startswith("search_") else "📍 Detalles"
             
-            print(f"   {i:2d}. {file_path.name}")
-            print(f"       📊 Tipo: {file_type}")
-            print(f"       📏 Tamaño: {file_size:,} bytes")
-            print(f"       📅 Modificado: {file_time.strftime('%Y-%m-%d %H:%M:%S')}")
-            print()
+            lines.append(
+                f"   {i:2d}. {name}\n"
+                f"       📊 Tipo: {file_type}\n"
+                f"       📏 Tamaño: {st.st_size:,} bytes\n"
+                f"       📅 Expira: {file_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            )
+        
+        print("\n".join(lines))
     
     def optimize_cache(self):
         """Optimiza el caché eliminando archivos expirados"""
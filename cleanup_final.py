@@ -8,6 +8,7 @@ Deja el repositorio completamente limpio para GitHub
 import os
 import shutil
 from pathlib import Path
+from typing import Optional
 
 class FinalCleanup:
     def __init__(self):
@@ -36,6 +37,22 @@ class FinalCleanup:
             "data/sample/",
         ]
 
+    def _remove_path(self, path: Path) -> Optional[str]:
+        """
+        Elimina una carpeta o archivo sin consultar antes su existencia
+        
+        Returns:
+            "carpeta", "archivo" o None si no existía
+        """
+        try:
+            shutil.rmtree(path)
+            return "carpeta"
+        except NotADirectoryError:
+            path.unlink(missing_ok=True)
+            return "archivo"
+        except FileNotFoundError:
+            return None
+
     def remove_unnecessary_files(self):
         """Elimina archivos innecesarios"""
         print("🗑️ Eliminando archivos innecesarios...")
@@ -43,16 +60,15 @@ class FinalCleanup:
         removed_count = 0
         
         for item in self.files_to_remove:
-            item_path = self.base_dir / item
+            removed = self._remove_path(self.base_dir / item)
             
-            if item_path.exists():
-                if item_path.is_dir():
-                    shutil.rmtree(item_path)
-                    print(f"🗑️ Eliminada carpeta: {item}")
-                else:
-                    item_path.unlink()
-                    print(f"🗑️ Eliminado archivo: {item}")
-                removed_count += 1
+            if removed == "carpeta":
+                print(f"🗑️ Eliminada carpeta: {item}")
+            elif removed == "archivo":
+                print(f"🗑️ Eliminado archivo: {item}")
+            else:
+                continue
+            removed_count += 1
         
         print(f"✅ Total eliminado: {removed_count} archivos/carpetas")
 
@@ -61,34 +77,40 @@ class FinalCleanup:
         print("\n📁 Limpiando carpeta de datos...")
         
         data_dir = self.base_dir / "data"
-        if data_dir.exists():
-            # Mantener solo sincelejo_sucre
-            for item in data_dir.iterdir():
-                if item.name != "sincelejo_sucre":
-                    if item.is_dir():
-                        shutil.rmtree(item)
-                        print(f"🗑️ Eliminada carpeta: data/{item.name}")
-                    else:
-                        item.unlink()
-                        print(f"🗑️ Eliminado archivo: data/{item.name}")
+        try:
+            entries = list(os.scandir(data_dir))
+        except FileNotFoundError:
+            return
+        
+        # Mantener solo sincelejo_sucre (scandir ya trae el tipo de cada entrada)
+        for entry in entries:
+            if entry.name == "sincelejo_sucre":
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+                print(f"🗑️ Eliminada carpeta: data/{entry.name}")
+            else:
+                os.unlink(entry.path)
+                print(f"🗑️ Eliminado archivo: data/{entry.name}")
 
     def clean_models_folder(self):
         """Limpia la carpeta de modelos"""
         print("\n🤖 Limpiando carpeta de modelos...")
         
         models_dir = self.base_dir / "models"
-        if models_dir.exists():
-            # Eliminar archivos de configuración
-            config_files = [
-                "model_registry.json",
-                "optimization_report.json"
-            ]
-            
-            for config_file in config_files:
-                config_path = models_dir / config_file
-                if config_path.exists():
-                    config_path.unlink()
-                    print(f"🗑️ Eliminado: models/{config_file}")
+        
+        # Eliminar archivos de configuración
+        config_files = [
+            "model_registry.json",
+            "optimization_report.json"
+        ]
+        
+        for config_file in config_files:
+            try:
+                (models_dir / config_file).unlink()
+            except FileNotFoundError:
+                continue
+            print(f"🗑️ Eliminado: models/{config_file}")
 
     def create_minimal_structure(self):
         """Crea estructura mínima necesaria"""
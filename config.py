@@ -5,17 +5,60 @@ Configuración para el Sistema de Recomendaciones Turísticas
 """
 
 import os
-from typing import Dict, Any
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional, Tuple
 from dotenv import load_dotenv
 
-# Cargar variables de entorno desde .env
-load_dotenv()
+# Cargar variables de entorno desde .env (único punto de carga del proyecto)
+load_dotenv(override=False)
+
+# Variables de entorno leídas una sola vez al importar
+_GMAPS_KEY = os.environ.get('GOOGLE_MAPS_API_KEY', '')
+
+# Registros inmutables de solo lectura. __slots__ explícito en lugar de
+# dataclass(slots=True) para seguir soportando Python 3.8/3.9.
+
+class _FrozenRecord:
+    """Base que permite serializar con pickle registros congelados con __slots__"""
+    __slots__ = ()
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+@dataclass(frozen=True)
+class CityInfo(_FrozenRecord):
+    """Ciudad de búsqueda con coordenadas ya convertidas a float"""
+    __slots__ = ('name', 'lat', 'lng', 'department')
+    name: str
+    lat: float
+    lng: float
+    department: str
+
+@dataclass(frozen=True)
+class TourismTypeInfo(_FrozenRecord):
+    """Tipo de lugar turístico y su equivalente en Google Places"""
+    __slots__ = ('google_type', 'keywords', 'ai_weight')
+    google_type: str
+    keywords: Tuple[str, ...]
+    ai_weight: float
+
+@dataclass(frozen=True)
+class TravelStylePreferences(_FrozenRecord):
+    """Preferencias asociadas a un estilo de viaje"""
+    __slots__ = ('preferred_types', 'min_rating', 'max_price_level')
+    preferred_types: FrozenSet[str]
+    min_rating: float
+    max_price_level: int
 
 class Config:
     """Configuración del sistema"""
     
     # Google Maps API
-    GOOGLE_MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY', 'TU_API_KEY_AQUI')
+    GOOGLE_MAPS_API_KEY = _GMAPS_KEY
     
     # Configuración de búsqueda
     SEARCH_CONFIG = {
@@ -24,127 +67,93 @@ class Config:
         'delay_between_requests': 0.2,  # segundos
         'language': 'es',
         'photo_max_width': 400,
-        'photo_max_height': 400
+        'photo_max_height': 400,
+        'details_cache_duration': 86400 * 7,  # 7 días para detalles de lugares
+        'nearby_cache_duration': 300,  # 5 minutos para búsquedas cercanas
+        'stale_cache_duration': 86400,  # 1 día de respaldo con entradas vencidas si la API falla
+        'cache_max_bytes': 100 * 1024 * 1024,  # 100 MB en disco
+        'request_timeout': (3.05, 10),  # (conexión, lectura) en segundos
+        'max_concurrent_requests': 5  # peticiones simultáneas en batch_place_details
     }
     
     # Ciudades de Colombia
-    COLOMBIAN_CITIES = {
-        'bogota': {
-            'name': 'Bogotá',
-            'lat': '4.6097',
-            'lng': '-74.0817',
-            'department': 'Cundinamarca'
-        },
-        'medellin': {
-            'name': 'Medellín',
-            'lat': '6.2442',
-            'lng': '-75.5812',
-            'department': 'Antioquia'
-        },
-        'cali': {
-            'name': 'Cali',
-            'lat': '3.4516',
-            'lng': '-76.5320',
-            'department': 'Valle del Cauca'
-        },
-        'cartagena': {
-            'name': 'Cartagena',
-            'lat': '10.3910',
-            'lng': '-75.4794',
-            'department': 'Bolívar'
-        },
-        'barranquilla': {
-            'name': 'Barranquilla',
-            'lat': '10.9685',
-            'lng': '-74.7813',
-            'department': 'Atlántico'
-        },
-        'bucaramanga': {
-            'name': 'Bucaramanga',
-            'lat': '7.1193',
-            'lng': '-73.1227',
-            'department': 'Santander'
-        },
-        'pereira': {
-            'name': 'Pereira',
-            'lat': '4.8133',
-            'lng': '-75.6961',
-            'department': 'Risaralda'
-        },
-        'manizales': {
-            'name': 'Manizales',
-            'lat': '5.0689',
-            'lng': '-75.5174',
-            'department': 'Caldas'
-        }
+    COLOMBIAN_CITIES: Dict[str, CityInfo] = {
+        'bogota': CityInfo(name='Bogotá', lat=4.6097, lng=-74.0817, department='Cundinamarca'),
+        'medellin': CityInfo(name='Medellín', lat=6.2442, lng=-75.5812, department='Antioquia'),
+        'cali': CityInfo(name='Cali', lat=3.4516, lng=-76.5320, department='Valle del Cauca'),
+        'cartagena': CityInfo(name='Cartagena', lat=10.3910, lng=-75.4794, department='Bolívar'),
+        'barranquilla': CityInfo(name='Barranquilla', lat=10.9685, lng=-74.7813, department='Atlántico'),
+        'bucaramanga': CityInfo(name='Bucaramanga', lat=7.1193, lng=-73.1227, department='Santander'),
+        'pereira': CityInfo(name='Pereira', lat=4.8133, lng=-75.6961, department='Risaralda'),
+        'manizales': CityInfo(name='Manizales', lat=5.0689, lng=-75.5174, department='Caldas')
     }
     
     # Tipos de lugares turísticos
-    TOURISM_TYPES = {
-        'restaurants': {
-            'google_type': 'restaurant',
-            'keywords': ['restaurante', 'comida', 'cocina'],
-            'ai_weight': 0.3
-        },
-        'hotels': {
-            'google_type': 'lodging',
-            'keywords': ['hotel', 'hospedaje', 'alojamiento'],
-            'ai_weight': 0.4
-        },
-        'attractions': {
-            'google_type': 'tourist_attraction',
-            'keywords': ['turístico', 'atracción', 'lugar'],
-            'ai_weight': 0.3
-        },
-        'museums': {
-            'google_type': 'museum',
-            'keywords': ['museo', 'cultura', 'arte'],
-            'ai_weight': 0.2
-        },
-        'parks': {
-            'google_type': 'park',
-            'keywords': ['parque', 'naturaleza', 'verde'],
-            'ai_weight': 0.2
-        },
-        'shopping': {
-            'google_type': 'shopping_mall',
-            'keywords': ['compras', 'centro comercial', 'tienda'],
-            'ai_weight': 0.1
-        },
-        'nightlife': {
-            'google_type': 'night_club',
-            'keywords': ['noche', 'discoteca', 'bar'],
-            'ai_weight': 0.1
-        }
+    TOURISM_TYPES: Dict[str, TourismTypeInfo] = {
+        'restaurants': TourismTypeInfo(
+            google_type='restaurant',
+            keywords=('restaurante', 'comida', 'cocina'),
+            ai_weight=0.3
+        ),
+        'hotels': TourismTypeInfo(
+            google_type='lodging',
+            keywords=('hotel', 'hospedaje', 'alojamiento'),
+            ai_weight=0.4
+        ),
+        'attractions': TourismTypeInfo(
+            google_type='tourist_attraction',
+            keywords=('turístico', 'atracción', 'lugar'),
+            ai_weight=0.3
+        ),
+        'museums': TourismTypeInfo(
+            google_type='museum',
+            keywords=('museo', 'cultura', 'arte'),
+            ai_weight=0.2
+        ),
+        'parks': TourismTypeInfo(
+            google_type='park',
+            keywords=('parque', 'naturaleza', 'verde'),
+            ai_weight=0.2
+        ),
+        'shopping': TourismTypeInfo(
+            google_type='shopping_mall',
+            keywords=('compras', 'centro comercial', 'tienda'),
+            ai_weight=0.1
+        ),
+        'nightlife': TourismTypeInfo(
+            google_type='night_club',
+            keywords=('noche', 'discoteca', 'bar'),
+            ai_weight=0.1
+        )
     }
     
     # Mapeo de estilos de viaje a preferencias
-    TRAVEL_STYLE_PREFERENCES = {
-        'cultural': {
-            'preferred_types': ['museum', 'art_gallery', 'tourist_attraction'],
-            'min_rating': 4.0,
-            'max_price_level': 4
-        },
-        'aventura': {
-            'preferred_types': ['park', 'tourist_attraction', 'natural_feature'],
-            'min_rating': 3.5,
-            'max_price_level': 3
-        },
-        'relajado': {
-            'preferred_types': ['spa', 'park', 'restaurant'],
-            'min_rating': 4.0,
-            'max_price_level': 4
-        },
-        'familiar': {
-            'preferred_types': ['park', 'tourist_attraction', 'restaurant'],
-            'min_rating': 3.5,
-            'max_price_level': 3
-        },
-        'negocios': {
-            'preferred_types': ['restaurant', 'lodging', 'shopping_mall'],
-            'min_rating': 4.0,
-            'max_price_level': 5
-        }
+    TRAVEL_STYLE_PREFERENCES: Dict[str, TravelStylePreferences] = {
+        'cultural': TravelStylePreferences(
+            preferred_types=frozenset(['museum', 'art_gallery', 'tourist_attraction']),
+            min_rating=4.0,
+            max_price_level=4
+        ),
+        'aventura': TravelStylePreferences(
+            preferred_types=frozenset(['park', 'tourist_attraction', 'natural_feature']),
+            min_rating=3.5,
+            max_price_level=3
+        ),
+        'relajado': TravelStylePreferences(
+            preferred_types=frozenset(['spa', 'park', 'restaurant']),
+            min_rating=4.0,
+            max_price_level=4
+        ),
+        'familiar': TravelStylePreferences(
+            preferred_types=frozenset(['park', 'tourist_attraction', 'restaurant']),
+            min_rating=3.5,
+            max_price_level=3
+        ),
+        'negocios': TravelStylePreferences(
+            preferred_types=frozenset(['restaurant', 'lodging', 'shopping_mall']),
+            min_rating=4.0,
+            max_price_level=5
+        )
     }
     
     # Configuración de exportación
@@ -157,19 +166,19 @@ class Config:
     }
     
     @classmethod
-    def get_city_info(cls, city_key: str) -> Dict[str, Any]:
+    def get_city_info(cls, city_key: str) -> Optional[CityInfo]:
         """Obtiene información de una ciudad"""
-        return cls.COLOMBIAN_CITIES.get(city_key, {})
+        return cls.COLOMBIAN_CITIES.get(city_key)
     
     @classmethod
-    def get_tourism_type_info(cls, type_key: str) -> Dict[str, Any]:
+    def get_tourism_type_info(cls, type_key: str) -> Optional[TourismTypeInfo]:
         """Obtiene información de un tipo de lugar turístico"""
-        return cls.TOURISM_TYPES.get(type_key, {})
+        return cls.TOURISM_TYPES.get(type_key)
     
     @classmethod
-    def get_travel_style_preferences(cls, style: str) -> Dict[str, Any]:
+    def get_travel_style_preferences(cls, style: str) -> Optional[TravelStylePreferences]:
         """Obtiene preferencias para un estilo de viaje"""
-        return cls.TRAVEL_STYLE_PREFERENCES.get(style, {})
+        return cls.TRAVEL_STYLE_PREFERENCES.get(style)
     
     @classmethod
     def validate_api_key(cls) -> bool:
@@ -4,31 +4,52 @@ Script para descargar modelos compactos específicos para el proyecto turístico
 Sincelejo y Sucre - Colombia
 """
 
+import argparse
 import os
-import torch
-from transformers import AutoTokenizer, AutoModel, AutoModelForCausalLM
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import json
+import orjson
+
+# Descarga multi-conexión en Rust si hf_transfer está instalado
+# (debe definirse antes de importar huggingface_hub)
+if importlib.util.find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+# Pesos de otros frameworks que no se usan localmente
+_IGNORE_PATTERNS = ["*.h5", "*.msgpack", "*.ot", "onnx/*", "openvino/*", "coreml/*"]
+
+
+def _write_json(path, data):
+    """Escribe un diccionario como JSON indentado usando orjson"""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
 
 class ModelDownloader:
     def __init__(self):
         self.models_dir = Path("models/pretrained")
         self.models_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _snapshot(self, repo_id, folder):
+        """Descarga los archivos del repositorio directamente a disco, sin cargar el modelo"""
+        from huggingface_hub import snapshot_download
+        
+        model_path = self.models_dir / folder
+        snapshot_download(
+            repo_id=repo_id,
+            local_dir=model_path,
+            local_dir_use_symlinks=False,
+            ignore_patterns=_IGNORE_PATTERNS
+        )
+        return model_path
         
     def download_distilbert(self):
         """Descargar DistilBERT para NLP y clasificación"""
         print("📥 Descargando DistilBERT...")
         try:
-            from transformers import DistilBertTokenizer, DistilBertModel
-            
             model_name = "distilbert-base-uncased"
-            tokenizer = DistilBertTokenizer.from_pretrained(model_name)
-            model = DistilBertModel.from_pretrained(model_name)
-            
-            # Guardar modelo
-            model_path = self.models_dir / "distilbert"
-            model.save_pretrained(model_path)
-            tokenizer.save_pretrained(model_path)
+            model_path = self._snapshot(model_name, "distilbert")
             
             # Información del modelo
             model_info = {
@@ -39,8 +60,7 @@ class ModelDownloader:
                 "quantization_ready": True
             }
             
-            with open(model_path / "model_info.json", "w") as f:
-                json.dump(model_info, f, indent=2)
+            _write_json(model_path / "model_info.json", model_info)
                 
             print(f"✅ DistilBERT guardado en {model_path}")
             return model_path
@@ -50,39 +70,36 @@ class ModelDownloader:
             return None
     
     def download_phi3_mini(self):
-        """Descargar Phi-3-mini para chat conversacional"""
-        print("📥 Descargando Phi-3-mini...")
+        """Descargar Phi-3-mini para chat conversacional (GGUF ya cuantizado a 4 bits)"""
+        print("📥 Descargando Phi-3-mini (q4 GGUF)...")
         try:
-            model_name = "microsoft/Phi-3-mini-4k-instruct"
+            from huggingface_hub import hf_hub_download
             
-            # Verificar si hay GPU disponible
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            print(f"🖥️  Usando dispositivo: {device}")
+            model_name = "microsoft/Phi-3-mini-4k-instruct-gguf"
+            model_file = "Phi-3-mini-4k-instruct-q4.gguf"
+            model_path = self.models_dir / "phi3_mini"
             
-            tokenizer = AutoTokenizer.from_pretrained(model_name)
-            model = AutoModelForCausalLM.from_pretrained(
-                model_name,
-                torch_dtype=torch.float16 if device == "cuda" else torch.float32,
-                device_map="auto" if device == "cuda" else None
+            # Solo el archivo cuantizado, sin pasar por los pesos FP16
+            hf_hub_download(
+                repo_id=model_name,
+                filename=model_file,
+                local_dir=model_path,
+                local_dir_use_symlinks=False
             )
             
-            # Guardar modelo
-            model_path = self.models_dir / "phi3_mini"
-            model.save_pretrained(model_path)
-            tokenizer.save_pretrained(model_path)
-            
             # Información del modelo
             model_info = {
                 "name": "Phi-3-mini",
-                "size_mb": 2500,
+                "size_mb": 2300,
                 "use_cases": ["chat_conversacional", "generacion_texto"],
-                "mobile_optimized": False,  # Requiere optimización
-                "quantization_ready": True,
-                "recommended_quantization": "int8"
+                "mobile_optimized": False,
+                "quantization_ready": False,  # Ya cuantizado
+                "format": "gguf",
+                "file": model_file,
+                "quantization": "q4"
             }
             
-            with open(model_path / "model_info.json", "w") as f:
-                json.dump(model_info, f, indent=2)
+            _write_json(model_path / "model_info.json", model_info)
                 
             print(f"✅ Phi-3-mini guardado en {model_path}")
             return model_path
@@ -95,14 +112,8 @@ class ModelDownloader:
         """Descargar modelo de embeddings para recomendaciones"""
         print("📥 Descargando Sentence Transformer...")
         try:
-            from sentence_transformers import SentenceTransformer
-            
             model_name = "all-MiniLM-L6-v2"
-            model = SentenceTransformer(model_name)
-            
-            # Guardar modelo
-            model_path = self.models_dir / "sentence_transformer"
-            model.save(str(model_path))
+            model_path = self._snapshot(f"sentence-transformers/{model_name}", "sentence_transformer")
             
             # Información del modelo
             model_info = {
@@ -113,8 +124,7 @@ class ModelDownloader:
                 "quantization_ready": True
             }
             
-            with open(model_path / "model_info.json", "w") as f:
-                json.dump(model_info, f, indent=2)
+            _write_json(model_path / "model_info.json", model_info)
                 
             print(f"✅ Sentence Transformer guardado en {model_path}")
             return model_path
@@ -146,9 +156,11 @@ class ModelDownloader:
                 },
                 "phi3_mini": {
                     "type": "generative",
-                    "size_mb": 2500,
+                    "format": "gguf",
+                    "quantization": "q4",
+                    "size_mb": 2300,
                     "mobile_ready": False,
-                    "requires_optimization": True
+                    "requires_optimization": False
                 }
             },
             "time_series_models": {
@@ -165,38 +177,57 @@ class ModelDownloader:
             }
         }
         
-        with open("models/model_registry.json", "w") as f:
-            json.dump(registry, f, indent=2)
+        _write_json("models/model_registry.json", registry)
         
         print("✅ Registro de modelos creado en models/model_registry.json")
 
-def main():
+# Modelos disponibles: clave CLI -> (nombre, método de ModelDownloader)
+AVAILABLE_MODELS = {
+    "distilbert": ("DistilBERT", "download_distilbert"),
+    "st": ("Sentence Transformer", "download_sentence_transformer"),
+    "phi3": ("Phi-3-mini", "download_phi3_mini"),
+}
+
+def parse_args(argv=None):
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Descarga modelos compactos para IA turística local"
+    )
+    parser.add_argument(
+        "--models", nargs="+", choices=list(AVAILABLE_MODELS), default=["distilbert", "st"],
+        help="Modelos a descargar (por defecto: distilbert st)"
+    )
+    parser.add_argument(
+        "--with-phi3", action="store_true",
+        help="Incluir Phi-3-mini (~2.3GB, q4 GGUF)"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1,
+        help="Descargas simultáneas (por defecto: 1)"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Función principal para descargar modelos"""
+    args = parse_args(argv)
+    selected = list(dict.fromkeys(args.models + (["phi3"] if args.with_phi3 else [])))
+    
     print("🤖 Descargando modelos compactos para IA turística local")
     print("=" * 60)
     
     downloader = ModelDownloader()
     
-    # Descargar modelos esenciales
-    models_downloaded = []
-    
-    # 1. DistilBERT (NLP básico)
-    distilbert_path = downloader.download_distilbert()
-    if distilbert_path:
-        models_downloaded.append("DistilBERT")
-    
-    # 2. Sentence Transformer (recomendaciones)
-    st_path = downloader.download_sentence_transformer()
-    if st_path:
-        models_downloaded.append("Sentence Transformer")
+    # Las descargas son de E/S, así que pueden ir en hilos en paralelo
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = [
+            executor.submit(getattr(downloader, AVAILABLE_MODELS[key][1]))
+            for key in selected
+        ]
+        paths = [future.result() for future in futures]
     
-    # 3. Phi-3-mini (chat - opcional, grande)
-    print("\n⚠️  Phi-3-mini es grande (~2.5GB). ¿Descargar? (s/n): ", end="")
-    response = input().lower()
-    if response == 's':
-        phi3_path = downloader.download_phi3_mini()
-        if phi3_path:
-            models_downloaded.append("Phi-3-mini")
+    models_downloaded = [
+        AVAILABLE_MODELS[key][0] for key, path in zip(selected, paths) if path
+    ]
     
     # Crear registro de modelos
     downloader.create_model_registry()
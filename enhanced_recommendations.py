@@ -5,22 +5,83 @@ Sistema de Recomendaciones Mejorado con Google Maps Places API
 Integra IA con datos reales de Google Maps para recomendaciones turísticas
 """
 
-import json
-import os
-from typing import Dict, List, Optional, Any
+import asyncio
+import heapq
+import orjson
+from dataclasses import asdict, dataclass, is_dataclass
+from itertools import islice
+from typing import Dict, List, Optional, Any, FrozenSet, Iterator, Tuple
 from datetime import datetime
 from pathlib import Path
-from dotenv import load_dotenv
-
-# Cargar variables de entorno desde .env
-load_dotenv()
-
+from config import Config
 from google_maps_client import GoogleMapsPlacesClient, PlacesDataExporter, PlaceDetails
 from hotel_recommendations import HotelRecommendationSystem
+from scoring import calculate_compatibility_scores
+
+# Etiquetas de nivel de precio de Google Places (0-4)
+_PRICE_LABELS = ('Gratis', 'Económico', 'Moderado', 'Caro', 'Muy caro')
+
+@dataclass
+class ScoredPlace:
+    """Lugar recomendado: referencia a sus detalles más el resultado de la IA"""
+    __slots__ = ('details', 'ai_score', 'match_reasons')
+    details: PlaceDetails
+    ai_score: float
+    match_reasons: List[str]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Formato plano usado en la exportación JSON"""
+        place = self.details
+        return {
+            'name': place.name,
+            'address': place.address,
+            'rating': place.rating,
+            'price_level': place.price_level,
+            'types': place.types,
+            'photos': place.photos,
+            'phone': place.phone_number,
+            'website': place.website,
+            'opening_hours': place.opening_hours,
+            'reviews': place.reviews,
+            'geometry': place.geometry,
+            'business_status': place.business_status,
+            'ai_score': self.ai_score,
+            'match_reasons': self.match_reasons
+        }
+
+def _json_default(obj: Any) -> Any:
+    """Serializa para orjson los dataclasses del sistema"""
+    if isinstance(obj, ScoredPlace):
+        return obj.to_dict()
+    if is_dataclass(obj):
+        return asdict(obj)
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
 
 class EnhancedTourismRecommendationSystem:
     """Sistema de recomendaciones turísticas mejorado con Google Maps"""
     
+    __slots__ = (
+        'google_maps_client', 'data_exporter', 'hotel_system', '_loop',
+        'tourism_types', 'colombian_cities', '_city_location', '_query_cache'
+    )
+    
+    # Tipos de lugares preferidos por estilo de viaje, tomados de Config (frozensets)
+    STYLE_PREFERRED_TYPES = {
+        style: prefs.preferred_types
+        for style, prefs in Config.TRAVEL_STYLE_PREFERENCES.items()
+    }
+    DEFAULT_PREFERRED_TYPES = frozenset(['tourist_attraction', 'restaurant'])
+    
+    # Umbral mínimo de score de IA para recomendar un lugar
+    MIN_AI_SCORE = 0.3
+    
+    # Plantillas de consulta para las categorías principales
+    QUERY_TEMPLATES = {
+        'restaurants': 'restaurantes {name}',
+        'hotels': 'hoteles {name}',
+        'attractions': 'lugares turísticos {name}'
+    }
+    
     def __init__(self, google_maps_api_key: str):
         """
         Inicializa el sistema mejorado
@@ -32,6 +93,9 @@ class EnhancedTourismRecommendationSystem:
         self.data_exporter = PlacesDataExporter(self.google_maps_client)
         self.hotel_system = HotelRecommendationSystem()
         
+        # Event loop propio para la API síncrona (ver _run_async)
+        self._loop = None
+        
         # Configuración de tipos de lugares turísticos
         self.tourism_types = {
             'restaurants': 'restaurant',
@@ -52,6 +116,17 @@ class EnhancedTourismRecommendationSystem:
             'barranquilla': {'lat': '10.9685', 'lng': '-74.7813', 'name': 'Barranquilla'},
             'bucaramanga': {'lat': '7.1193', 'lng': '-73.1227', 'name': 'Bucaramanga'}
         }
+        
+        # Cadenas invariantes precalculadas una sola vez por ciudad y categoría
+        self._city_location: Dict[str, str] = {
+            key: f"{info['lat']},{info['lng']}"
+            for key, info in self.colombian_cities.items()
+        }
+        self._query_cache: Dict[Tuple[str, str], str] = {
+            (key, place_type): template.format(name=info['name'])
+            for key, info in self.colombian_cities.items()
+            for place_type, template in self.QUERY_TEMPLATES.items()
+        }
     
     def search_tourism_places(self, city: str, place_type: str, 
                             query: str = None, limit: int = 8) -> List[Dict[str, Any]]:
@@ -67,39 +142,67 @@ class EnhancedTourismRecommendationSystem:
         Returns:
             Lista de lugares encontrados
         """
+        search = self._prepare_search(city, place_type, query)
+        if search is None:
+            return []
+        
+        # Realizar búsqueda optimizada (ya está limitada a 8 en el cliente)
+        return self.google_maps_client.text_search(**search)
+    
+    async def _search_async(self, session, city: str, place_type: str,
+                            query: str = None) -> List[Dict[str, Any]]:
+        """
+        Versión asíncrona de search_tourism_places
+        
+        Args:
+            session: Sesión aiohttp compartida
+            city: Nombre de la ciudad
+            place_type: Tipo de lugar
+            query: Consulta específica (opcional)
+            
+        Returns:
+            Lista de lugares encontrados
+        """
+        search = self._prepare_search(city, place_type, query)
+        if search is None:
+            return []
+        
+        return await self.google_maps_client.text_search_async(session, **search)
+    
+    def _prepare_search(self, city: str, place_type: str,
+                        query: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Construye los argumentos de Text Search para una ciudad y categoría
+        
+        Args:
+            city: Nombre de la ciudad
+            place_type: Tipo de lugar
+            query: Consulta específica (opcional)
+            
+        Returns:
+            Argumentos para text_search o None si la ciudad no existe
+        """
         if city not in self.colombian_cities:
             print(f"❌ Ciudad '{city}' no reconocida")
-            return []
+            return None
         
         city_info = self.colombian_cities[city]
-        location = f"{city_info['lat']},{city_info['lng']}"
-        
-        # Determinar tipo de lugar para Google Places
-        google_type = self.tourism_types.get(place_type, 'tourist_attraction')
         
         # Construir consulta
         if not query:
-            if place_type == 'restaurants':
-                query = f"restaurantes {city_info['name']}"
-            elif place_type == 'hotels':
-                query = f"hoteles {city_info['name']}"
-            elif place_type == 'attractions':
-                query = f"lugares turísticos {city_info['name']}"
-            else:
+            query = self._query_cache.get((city, place_type))
+            if query is None:
                 query = f"{place_type} {city_info['name']}"
         
         print(f"🔍 Buscando {place_type} en {city_info['name']}...")
         
-        # Realizar búsqueda optimizada
-        results = self.google_maps_client.text_search(
-            query=query,
-            location=location,
-            radius=20000,  # 20km
-            type_filter=google_type
-        )
-        
-        # Ya está limitado a 8 en el cliente
-        return results
+        return {
+            'query': query,
+            'location': self._city_location[city],
+            'radius': 20000,  # 20km
+            # Determinar tipo de lugar para Google Places
+            'type_filter': self.tourism_types.get(place_type, 'tourist_attraction')
+        }
     
     def get_enhanced_place_details(self, place_ids: List[str]) -> List[PlaceDetails]:
         """
@@ -114,11 +217,59 @@ class EnhancedTourismRecommendationSystem:
         print(f"📊 Obteniendo detalles de {len(place_ids)} lugares (optimizado)...")
         return self.google_maps_client.batch_place_details(place_ids)
     
+    async def _details_async(self, session, place_ids: List[str]) -> List[PlaceDetails]:
+        """
+        Versión asíncrona de get_enhanced_place_details
+        
+        Args:
+            session: Sesión aiohttp compartida
+            place_ids: Lista de IDs de lugares (máximo 8)
+            
+        Returns:
+            Lista de detalles de lugares
+        """
+        print(f"📊 Obteniendo detalles de {len(place_ids)} lugares (en paralelo)...")
+        return await self.google_maps_client.batch_place_details_async(session, place_ids)
+    
     def generate_ai_recommendations(self, user_preferences: Dict[str, Any], 
-                                  city: str = 'bogota') -> Dict[str, Any]:
+                                  city: str = 'bogota', limit: int = 5) -> Dict[str, Any]:
         """
         Genera recomendaciones usando IA + Google Maps
         
+        Args:
+            user_preferences: Preferencias del usuario
+            city: Ciudad para buscar
+            limit: Número de recomendaciones por categoría
+            
+        Returns:
+            Recomendaciones estructuradas
+        """
+        return self._run_async(self.generate_ai_recommendations_async(user_preferences, city, limit))
+    
+    def _run_async(self, coro):
+        """
+        Ejecuta una corrutina en el event loop propio del sistema
+        
+        El loop se conserva entre llamadas para reutilizar la sesión HTTP
+        del cliente de Google Maps (un solo handshake por host).
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+    
+    def close(self):
+        """Cierra las sesiones HTTP del cliente y los event loops propios"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.run_until_complete(self.google_maps_client.close_async_session())
+            self._loop.close()
+        self._loop = None
+        self.google_maps_client.close()
+    
+    async def generate_ai_recommendations_async(self, user_preferences: Dict[str, Any],
+                                                city: str = 'bogota', limit: int = 5) -> Dict[str, Any]:
+        """
+        Genera recomendaciones consultando todas las categorías en paralelo
+        
         Args:
             user_preferences: Preferencias del usuario
             city: Ciudad para buscar
@@ -138,41 +289,39 @@ class EnhancedTourismRecommendationSystem:
         # Buscar en diferentes categorías
         categories_to_search = ['restaurants', 'attractions', 'hotels']
         
-        for category in categories_to_search:
-            print(f"\n🔍 Buscando {category}...")
-            
-            # Buscar lugares (limitado a 8)
-            places = self.search_tourism_places(
-                city=city,
-                place_type=category,
-                limit=8
-            )
-            
-            if not places:
-                continue
-            
-            # Obtener IDs de lugares
+        session = await self.google_maps_client.get_async_session()
+        
+        # Buscar lugares de todas las categorías a la vez (limitado a 8)
+        searches = await asyncio.gather(
+            *(self._search_async(session, city, category) for category in categories_to_search)
+        )
+        
+        # Obtener IDs de lugares por categoría
+        pending = []
+        for category, places in zip(categories_to_search, searches):
             place_ids = [place.get('place_id') for place in places if place.get('place_id')]
-            
-            if not place_ids:
-                continue
-            
-            # Obtener detalles
-            place_details = self.get_enhanced_place_details(place_ids)
-            
-            # Filtrar y rankear por IA
-            filtered_places = self._filter_by_ai_preferences(place_details, user_preferences)
+            if place_ids:
+                pending.append((category, places, place_ids))
+        
+        # Obtener detalles de todas las categorías a la vez
+        all_details = await asyncio.gather(
+            *(self._details_async(session, place_ids) for _, _, place_ids in pending)
+        )
+        
+        for (category, places, _), place_details in zip(pending, all_details):
+            # Filtrar y rankear por IA (solo se construyen los mejores)
+            top_places, total_filtered = self._select_top_places(place_details, user_preferences, limit)
             
             recommendations['categories'][category] = {
                 'total_found': len(places),
-                'ai_filtered': len(filtered_places),
-                'places': filtered_places[:5]  # Top 5
+                'ai_filtered': total_filtered,
+                'places': top_places
             }
         
         return recommendations
     
     def _filter_by_ai_preferences(self, places: List[PlaceDetails], 
-                                 user_preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
+                                 user_preferences: Dict[str, Any]) -> List['ScoredPlace']:
         """
         Filtra lugares usando preferencias del usuario y IA
         
@@ -183,72 +332,50 @@ class EnhancedTourismRecommendationSystem:
         Returns:
             Lugares filtrados y rankeados
         """
-        filtered_places = []
-        
-        for place in places:
-            # Calcular score de compatibilidad
-            compatibility_score = self._calculate_compatibility_score(place, user_preferences)
-            
-            if compatibility_score > 0.3:  # Umbral mínimo
-                place_data = {
-                    'name': place.name,
-                    'address': place.address,
-                    'rating': place.rating,
-                    'price_level': place.price_level,
-                    'types': place.types,
-                    'photos': place.photos,
-                    'phone': place.phone_number,
-                    'website': place.website,
-                    'opening_hours': place.opening_hours,
-                    'reviews': place.reviews,
-                    'geometry': place.geometry,
-                    'business_status': place.business_status,
-                    'ai_score': compatibility_score,
-                    'match_reasons': self._get_ai_match_reasons(place, user_preferences)
-                }
-                filtered_places.append(place_data)
-        
-        # Ordenar por score de IA
-        filtered_places.sort(key=lambda x: x['ai_score'], reverse=True)
-        return filtered_places
+        return self._select_top_places(places, user_preferences)[0]
     
-    def _calculate_compatibility_score(self, place: PlaceDetails, 
-                                     user_preferences: Dict[str, Any]) -> float:
+    def _select_top_places(self, places: List[PlaceDetails], user_preferences: Dict[str, Any],
+                           top_k: Optional[int] = None) -> Tuple[List['ScoredPlace'], int]:
         """
-        Calcula score de compatibilidad usando IA
+        Rankea lugares por score de IA y construye solo los top_k mejores
         
         Args:
-            place: Detalles del lugar
+            places: Lista de lugares
             user_preferences: Preferencias del usuario
+            top_k: Número máximo de lugares a devolver (None para todos)
             
         Returns:
-            Score de compatibilidad (0-1)
+            Tupla (lugares rankeados, total de lugares que superan el umbral)
         """
-        score = 0.0
-        
-        # Score por rating
-        if place.rating >= user_preferences.get('min_rating', 3.0):
-            rating_score = (place.rating - user_preferences.get('min_rating', 3.0)) / 2.0
-            score += min(rating_score, 0.4)  # Máximo 40% del score
-        
-        # Score por precio
-        max_price_level = user_preferences.get('max_price_level', 3)
-        if place.price_level <= max_price_level:
-            price_score = (max_price_level - place.price_level) / max_price_level
-            score += price_score * 0.3  # 30% del score
-        
-        # Score por tipo de lugar
-        preferred_types = user_preferences.get('preferred_types', [])
-        if any(tipo in place.types for tipo in preferred_types):
-            score += 0.2  # 20% del score
-        
-        # Score por reviews (calidad)
-        if place.reviews and len(place.reviews) >= 3:
-            avg_review_rating = sum(r.get('rating', 0) for r in place.reviews) / len(place.reviews)
-            if avg_review_rating >= 4.0:
-                score += 0.1  # 10% del score
+        if not places:
+            return [], 0
+        
+        # Convertir los tipos preferidos a conjunto una sola vez para todos los lugares
+        preferred_types = user_preferences.get('preferred_types', frozenset())
+        if not isinstance(preferred_types, frozenset):
+            user_preferences = {**user_preferences, 'preferred_types': frozenset(preferred_types)}
+        
+        # Calcular scores de compatibilidad de todos los lugares a la vez
+        scores = calculate_compatibility_scores(places, user_preferences, self.MIN_AI_SCORE).tolist()
+        candidates = [index for index, score in enumerate(scores) if score > self.MIN_AI_SCORE]
+        
+        # Orden por score de IA descendente (estable ante empates); con top_k
+        # basta un heap de tamaño k en lugar de ordenar todos los candidatos
+        if top_k is None:
+            ranked = sorted(candidates, key=scores.__getitem__, reverse=True)
+        else:
+            ranked = heapq.nlargest(top_k, candidates, key=scores.__getitem__)
+        
+        filtered_places = [
+            ScoredPlace(
+                details=places[index],
+                ai_score=scores[index],
+                match_reasons=self._get_ai_match_reasons(places[index], user_preferences)
+            )
+            for index in ranked
+        ]
         
-        return min(score, 1.0)
+        return filtered_places, len(candidates)
     
     def _get_ai_match_reasons(self, place: PlaceDetails, 
                             user_preferences: Dict[str, Any]) -> List[str]:
@@ -262,22 +389,23 @@ class EnhancedTourismRecommendationSystem:
         Returns:
             Lista de razones
         """
-        reasons = []
-        
+        return list(islice(self._iter_ai_match_reasons(place, user_preferences), 3))
+    
+    def _iter_ai_match_reasons(self, place: PlaceDetails,
+                               user_preferences: Dict[str, Any]) -> Iterator[str]:
+        """Genera las razones en orden de prioridad (solo se formatean las que se consumen)"""
         if place.rating >= user_preferences.get('min_rating', 3.0):
-            reasons.append(f"Rating alto ({place.rating}/5)")
+            yield f"Rating alto ({place.rating}/5)"
         
         if place.price_level <= user_preferences.get('max_price_level', 3):
-            price_labels = ['Gratis', 'Económico', 'Moderado', 'Caro', 'Muy caro']
-            reasons.append(f"Precio {price_labels[place.price_level] if place.price_level < len(price_labels) else 'Accesible'}")
+            label = _PRICE_LABELS[place.price_level] if place.price_level < len(_PRICE_LABELS) else 'Accesible'
+            yield f"Precio {label}"
         
         if place.reviews and len(place.reviews) >= 3:
-            reasons.append(f"Bien valorado ({len(place.reviews)} reseñas)")
+            yield f"Bien valorado ({len(place.reviews)} reseñas)"
         
         if place.business_status == 'OPERATIONAL':
-            reasons.append("Actualmente abierto")
-        
-        return reasons[:3]
+            yield "Actualmente abierto"
     
     def export_recommendations_to_json(self, recommendations: Dict[str, Any], 
                                      filename: str = None) -> Dict[str, Any]:
@@ -306,8 +434,12 @@ class EnhancedTourismRecommendationSystem:
         }
         
         if filename:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(
+                    export_data,
+                    default=_json_default,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+                ))
             print(f"💾 Recomendaciones exportadas a: {filename}")
         
         return export_data
@@ -351,7 +483,7 @@ class EnhancedTourismRecommendationSystem:
         
         return {}
     
-    def _get_preferred_types_by_style(self, travel_style: str) -> List[str]:
+    def _get_preferred_types_by_style(self, travel_style: str) -> FrozenSet[str]:
         """
         Obtiene tipos de lugares preferidos según el estilo de viaje
         
@@ -359,17 +491,9 @@ class EnhancedTourismRecommendationSystem:
             travel_style: Estilo de viaje del usuario
             
         Returns:
-            Lista de tipos preferidos
+            Conjunto de tipos preferidos
         """
-        style_mapping = {
-            'cultural': ['museum', 'art_gallery', 'tourist_attraction'],
-            'aventura': ['park', 'tourist_attraction', 'natural_feature'],
-            'relajado': ['spa', 'park', 'restaurant'],
-            'familiar': ['park', 'tourist_attraction', 'restaurant'],
-            'negocios': ['restaurant', 'lodging', 'shopping_mall']
-        }
-        
-        return style_mapping.get(travel_style, ['tourist_attraction', 'restaurant'])
+        return self.STYLE_PREFERRED_TYPES.get(travel_style, self.DEFAULT_PREFERRED_TYPES)
 
 def main():
     """Función principal de demostración"""
@@ -378,7 +502,7 @@ def main():
     print("="*60)
     
     # Verificar API key
-    api_key = os.getenv('GOOGLE_MAPS_API_KEY')
+    api_key = Config.GOOGLE_MAPS_API_KEY
     if not api_key:
         print("❌ Error: No se encontró GOOGLE_MAPS_API_KEY")
         print("💡 Configura tu API key con: export GOOGLE_MAPS_API_KEY='tu_api_key'")
@@ -404,6 +528,8 @@ def main():
             print(f"✅ Recomendaciones generadas para {city}")
             print(f"📊 Categorías: {list(recommendations.get('categories', {}).keys())}")
     
+    system.close()
+    
     print("\n✅ Sistema de recomendaciones completado")
     print("📁 Revisa los archivos JSON generados para ver los resultados")
 
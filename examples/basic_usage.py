@@ -5,38 +5,43 @@ Ejemplo de uso de la IA Turística para Colombia
 Demuestra cómo usar los modelos entrenados
 """
 
-import joblib
-import numpy as np
+import functools
 from pathlib import Path
 
+import rec_core
+
+@functools.lru_cache(maxsize=1)
 def load_models():
-    """Carga los modelos entrenados"""
+    """Carga los modelos entrenados (una sola vez por proceso)"""
+    import joblib  # import diferido: solo se paga al cargar modelos
+    
     models_dir = Path(__file__).parent.parent / "models" / "final"
     
     # Cargar modelo de recomendaciones
-    rec_model = joblib.load(models_dir / "mlp_recommendations.pkl")
-    rec_features = joblib.load(models_dir / "recommendation_features.pkl")
+    # mmap_mode='r': los arrays numpy se mapean desde disco (solo lectura) en vez de copiarse
+    rec_model = joblib.load(models_dir / "mlp_recommendations.pkl", mmap_mode='r')
+    rec_features = joblib.load(models_dir / "recommendation_features.pkl", mmap_mode='r')
+    rec_core.to_float32(rec_model, rec_features)
     
     return rec_model, rec_features
 
+@functools.lru_cache(maxsize=1)
+def _scorer():
+    """Scorer compartido: precálculos del modelo hechos una sola vez"""
+    return rec_core.RecommendationScorer(*load_models())
+
 def get_recommendations(user_id=0, limit=3):
     """Obtiene recomendaciones para un usuario"""
-    model, features = load_models()
+    _, features = load_models()
     
     user_features = features['user_features'][user_id]
     activities = features['activities']
-    activity_features = features['activity_features']
     
     # Generar recomendaciones
-    predictions = []
-    for activity_id in range(len(activities)):
-        combined_features = np.concatenate([user_features, activity_features[activity_id]])
-        pred = model.predict([combined_features])[0]
-        predictions.append(pred)
+    predictions = _scorer().score(user_features)
     
     # Obtener top recomendaciones
-    predictions = np.array(predictions)
-    top_indices = np.argsort(predictions)[-limit:][::-1]
+    top_indices = rec_core.top_k(predictions, limit)
     
     recommendations = []
     for i, idx in enumerate(top_indices):
@@ -5,14 +5,63 @@ Demostración de uso de modelos de IA en aplicación móvil
 Simula cómo se usarían los modelos en una app de turismo colombiano
 """
 
-import json
-import joblib
+from collections import Counter
 import numpy as np
+import orjson
 from pathlib import Path
 import time
 
+import models_store
+import rec_core
+
+_BANNER = "=" * 50
+_WIDE_BANNER = "=" * 60
+
+# Palabras clave de relevancia (las de relevancia alta tienen prioridad sobre las de media)
+_RELEVANCE_HIGH_KEYWORDS = ('naturaleza', 'playa', 'mar', 'ecoturismo')
+_RELEVANCE_MEDIUM_KEYWORDS = ('cultural', 'museo', 'catedral', 'feria', 'arte')
+_RELEVANCE_CONFIDENCE = {'high': 0.85, 'medium': 0.75, 'low': 0.60}
+
+# Hora de inicio sugerida por franja; cualquier otro valor se trata como 'evening'
+_START_HOUR = {'morning': 8, 'afternoon': 14, 'evening': 18}
+_DEFAULT_START_HOUR = 18
+
+# Frase destacada del resumen de viaje por categoría
+_HIGHLIGHT_TEMPLATES = {
+    'cultural': "Exploraste {name}, un lugar lleno de historia y cultura",
+    'naturaleza': "Disfrutaste de {name}, conectando con la naturaleza",
+}
+
+def _write_json_items(path, items):
+    """
+    Escribe un objeto JSON clave a clave, sin serializarlo entero en memoria
+    
+    El resultado es idéntico a orjson.dumps(dict(items), option=orjson.OPT_INDENT_2).
+    
+    Args:
+        path: Archivo de salida
+        items: Iterable de pares (clave, valor)
+    """
+    with open(path, "wb") as f:
+        separator = b"{\n"
+        for key, value in items:
+            f.write(separator)
+            f.write(b"  " + orjson.dumps(key) + b": ")
+            f.write(orjson.dumps(value, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n  "))
+            separator = b",\n"
+        f.write(b"{}" if separator == b"{\n" else b"\n}")
+
+def _print_classification(content_text, classification):
+    """Muestra el texto de una notificación y la relevancia asignada"""
+    print(f"📝 Texto: '{content_text}'")
+    print(f"🎯 Relevancia: {classification['relevance']} (Confianza: {classification['confidence']:.2f})")
+
 class MobileAppDemo:
-    def __init__(self):
+    # Modelos compartidos entre instancias: se cargan de disco una sola vez
+    _models_cache = None
+
+    def __init__(self, debug=False):
+        self.debug = debug  # Tiempos de inferencia y detalle por recomendación
         self.base_dir = Path(__file__).parent.parent  # Ir al directorio raíz del proyecto
         self.models_dir = self.base_dir / "models" / "trained"
         self.mobile_models_dir = self.base_dir / "mobile_models"
@@ -33,30 +82,50 @@ class MobileAppDemo:
 
     def load_models(self):
         """Carga los modelos optimizados para móviles"""
+        if MobileAppDemo._models_cache is not None:
+            (self.rec_model, self.rec_features, self.cls_model_data,
+             self.scorer) = MobileAppDemo._models_cache
+            print("📱 Modelos reutilizados desde caché")
+            return
+        
         print("📱 Cargando modelos para aplicación móvil...")
         
         try:
+            import joblib  # import diferido: solo se paga al cargar modelos
+            
             # Cargar modelo de recomendaciones
             rec_model_path = self.models_dir / "mlp_recommendations.pkl"
             rec_features_path = self.models_dir / "recommendation_features.pkl"
             
             if rec_model_path.exists() and rec_features_path.exists():
-                self.rec_model = joblib.load(rec_model_path)
-                self.rec_features = joblib.load(rec_features_path)
+                # mmap_mode='r': los arrays numpy se mapean desde disco (solo lectura)
+                self.rec_model = joblib.load(rec_model_path, mmap_mode='r')
+                self.rec_features = joblib.load(rec_features_path, mmap_mode='r')
+                rec_core.to_float32(self.rec_model, self.rec_features)
+                if hasattr(self.rec_model, 'coefs_'):
+                    # Un único juego de pesos/features en memoria para todos los procesos
+                    if models_store.share_model_arrays(self.rec_model, self.rec_features, rec_model_path):
+                        print("🔗 Pesos compartidos con otro proceso (memoria compartida)")
                 print("✅ Modelo de recomendaciones cargado")
             else:
                 print("❌ Modelo de recomendaciones no encontrado")
                 self.rec_model = None
+                self.rec_features = None
             
             # Cargar modelo de clasificación
             cls_model_path = self.models_dir / "rf_classification.pkl"
             if cls_model_path.exists():
-                self.cls_model_data = joblib.load(cls_model_path)
+                self.cls_model_data = joblib.load(cls_model_path, mmap_mode='r')
                 print("✅ Modelo de clasificación cargado")
             else:
                 print("❌ Modelo de clasificación no encontrado")
                 self.cls_model_data = None
             
+            self.scorer = None
+            if self.rec_model:
+                self.scorer = rec_core.RecommendationScorer(self.rec_model, self.rec_features)
+            MobileAppDemo._models_cache = (self.rec_model, self.rec_features,
+                                           self.cls_model_data, self.scorer)
             print("📱 Modelos listos para uso móvil")
             
         except Exception as e:
@@ -65,7 +134,7 @@ class MobileAppDemo:
     def get_personalized_recommendations(self, user_id=0, limit=3):
         """Obtiene recomendaciones personalizadas para el usuario"""
         print(f"\n🎯 OBTENIENDO RECOMENDACIONES PERSONALIZADAS")
-        print("=" * 50)
+        print(_BANNER)
         
         if not self.rec_model:
             print("❌ Modelo de recomendaciones no disponible")
@@ -73,21 +142,17 @@ class MobileAppDemo:
         
         try:
             user_features = self.rec_features['user_features'][user_id]
-            activity_features = self.rec_features['activity_features']
             activities = self.rec_features['activities']
             
             # Generar recomendaciones
-            start_time = time.time()
-            predictions = []
-            for activity_id in range(len(activities)):
-                combined_features = np.concatenate([user_features, activity_features[activity_id]])
-                pred = self.rec_model.predict([combined_features])[0]
-                predictions.append(pred)
-            inference_time = time.time() - start_time
+            if self.debug:
+                start_ns = time.perf_counter_ns()
+            predictions = self.scorer.score(user_features)
+            if self.debug:
+                inference_ns = time.perf_counter_ns() - start_ns
             
             # Obtener top recomendaciones
-            predictions = np.array(predictions)
-            top_indices = np.argsort(predictions)[-limit:][::-1]
+            top_indices = rec_core.top_k(predictions, limit)
             
             recommendations = []
             for i, idx in enumerate(top_indices):
@@ -105,12 +170,13 @@ class MobileAppDemo:
                 }
                 recommendations.append(recommendation)
             
-            print(f"⚡ Inferencia completada en {inference_time:.3f}s")
-            print(f"👤 Recomendaciones para usuario {user_id + 1}:")
-            
-            for rec in recommendations:
-                print(f"   {rec['rank']}. {rec['name']} - {rec['category']}")
-                print(f"      📍 {rec['location']} | ⏰ {rec['best_time']} | ⭐ {rec['score']:.1f}")
+            if self.debug:
+                print(f"⚡ Inferencia completada en {inference_ns / 1e9:.3f}s")
+                print(f"👤 Recomendaciones para usuario {user_id + 1}:")
+                
+                for rec in recommendations:
+                    print(f"   {rec['rank']}. {rec['name']} - {rec['category']}")
+                    print(f"      📍 {rec['location']} | ⏰ {rec['best_time']} | ⭐ {rec['score']:.1f}")
             
             return recommendations
             
@@ -121,52 +187,52 @@ class MobileAppDemo:
     def classify_content_relevance(self, content_text):
         """Clasifica la relevancia del contenido para notificaciones"""
         print(f"\n📊 CLASIFICANDO RELEVANCIA DE CONTENIDO")
-        print("=" * 50)
+        print(_BANNER)
         
         if not self.cls_model_data:
             print("❌ Modelo de clasificación no disponible")
             return {"relevance": "medium", "confidence": 0.5, "should_notify": True}
         
         try:
-            # Simular clasificación basada en palabras clave
-            text_lower = content_text.lower()
-            
-            if any(word in text_lower for word in ['naturaleza', 'playa', 'mar', 'ecoturismo']):
-                relevance = 'high'
-                confidence = 0.85
-            elif any(word in text_lower for word in ['cultural', 'museo', 'catedral', 'feria', 'arte']):
-                relevance = 'medium'
-                confidence = 0.75
-            else:
-                relevance = 'low'
-                confidence = 0.60
-            
-            print(f"📝 Texto: '{content_text}'")
-            print(f"🎯 Relevancia: {relevance} (Confianza: {confidence:.2f})")
-            
-            return {
-                "relevance": relevance,
-                "confidence": confidence,
-                "should_notify": relevance in ['high', 'medium']
-            }
+            # Misma clasificación que el lote, para un solo texto
+            classification = self.classify_notifications_batch([content_text])[0]
+            _print_classification(content_text, classification)
+            return classification
             
         except Exception as e:
             print(f"❌ Error clasificando contenido: {e}")
             return {"relevance": "medium", "confidence": 0.5, "should_notify": True}
 
+    def classify_notifications_batch(self, notifications):
+        """
+        Clasifica en bloque la relevancia de varias notificaciones (una pasada vectorizada)
+        
+        Es la única implementación de la clasificación por palabras clave;
+        classify_content_relevance la usa con un solo texto.
+        """
+        if not self.cls_model_data:
+            return [{"relevance": "medium", "confidence": 0.5, "should_notify": True} for _ in notifications]
+        
+        texts = np.char.lower(np.asarray(notifications, dtype=str))
+        has_high = np.any([np.char.find(texts, word) >= 0 for word in _RELEVANCE_HIGH_KEYWORDS], axis=0)
+        has_medium = np.any([np.char.find(texts, word) >= 0 for word in _RELEVANCE_MEDIUM_KEYWORDS], axis=0)
+        relevances = np.where(has_high, 'high', np.where(has_medium, 'medium', 'low'))
+        
+        return [
+            {
+                "relevance": relevance,
+                "confidence": _RELEVANCE_CONFIDENCE[relevance],
+                "should_notify": relevance != 'low'
+            }
+            for relevance in relevances.tolist()
+        ]
+
     def get_optimal_schedule(self, activities, available_time="4 hours"):
         """Sugiere horarios óptimos para las actividades"""
         print(f"\n⏰ PLANIFICANDO HORARIOS ÓPTIMOS")
-        print("=" * 50)
+        print(_BANNER)
         
         try:
-            # Mapear horarios óptimos
-            time_mapping = {
-                'morning': '08:00 - 12:00',
-                'afternoon': '12:00 - 18:00', 
-                'evening': '18:00 - 22:00'
-            }
-            
             schedule = []
             current_time = 8  # 8:00 AM
             
@@ -175,13 +241,7 @@ class MobileAppDemo:
                 duration = activity.get('duration_hours', 2)
                 
                 # Sugerir horario basado en best_time
-                if best_time == 'morning':
-                    start_hour = 8
-                elif best_time == 'afternoon':
-                    start_hour = 14
-                else:  # evening
-                    start_hour = 18
-                
+                start_hour = _START_HOUR.get(best_time, _DEFAULT_START_HOUR)
                 end_hour = start_hour + duration
                 
                 schedule_item = {
@@ -207,33 +267,28 @@ class MobileAppDemo:
     def generate_trip_summary(self, activities_visited):
         """Genera un resumen automático del viaje"""
         print(f"\n📝 GENERANDO RESUMEN DEL VIAJE")
-        print("=" * 50)
+        print(_BANNER)
         
         try:
-            # Contar actividades por categoría
-            categories = {}
-            total_duration = 0
+            # Categoría de cada actividad, leída una sola vez
+            activity_categories = [activity.get('category', 'general') for activity in activities_visited]
+            categories = Counter(activity_categories)
+            total_duration = sum(activity.get('duration_hours', 2) for activity in activities_visited)
             
-            for activity in activities_visited:
-                category = activity.get('category', 'general')
-                categories[category] = categories.get(category, 0) + 1
-                total_duration += activity.get('duration_hours', 2)
+            highlights = []
+            for activity, category in zip(activities_visited, activity_categories):
+                template = _HIGHLIGHT_TEMPLATES.get(category)
+                if template is not None:
+                    highlights.append(template.format(name=activity['name']))
             
             # Generar resumen
             summary = {
                 "total_activities": len(activities_visited),
                 "total_duration": f"{total_duration} horas",
-                "categories_visited": categories,
-                "highlights": []
+                "categories_visited": dict(categories),
+                "highlights": highlights
             }
             
-            # Agregar highlights
-            for activity in activities_visited:
-                if activity.get('category') == 'cultural':
-                    summary['highlights'].append(f"Exploraste {activity['name']}, un lugar lleno de historia y cultura")
-                elif activity.get('category') == 'naturaleza':
-                    summary['highlights'].append(f"Disfrutaste de {activity['name']}, conectando con la naturaleza")
-            
             print("🎯 Resumen del viaje:")
             print(f"   📊 Total de actividades: {summary['total_activities']}")
             print(f"   ⏱️ Duración total: {summary['total_duration']}")
@@ -251,11 +306,11 @@ class MobileAppDemo:
     def simulate_mobile_app_usage(self):
         """Simula el uso completo de la aplicación móvil"""
         print("📱 SIMULACIÓN DE APLICACIÓN MÓVIL")
-        print("=" * 60)
+        print(_WIDE_BANNER)
         print("Usuario: María González")
         print("Ubicación: Sincelejo, Sucre")
         print("Hora actual: 14:30")
-        print("=" * 60)
+        print(_WIDE_BANNER)
         
         # 1. Obtener recomendaciones personalizadas
         recommendations = self.get_personalized_recommendations(user_id=0, limit=3)
@@ -268,11 +323,12 @@ class MobileAppDemo:
         ]
         
         print(f"\n🔔 PROCESANDO NOTIFICACIONES")
-        print("=" * 50)
+        print(_BANNER)
         relevant_notifications = []
+        classifications = self.classify_notifications_batch(notifications)
         
-        for notification in notifications:
-            classification = self.classify_content_relevance(notification)
+        for notification, classification in zip(notifications, classifications):
+            _print_classification(notification, classification)
             if classification['should_notify']:
                 relevant_notifications.append({
                     "text": notification,
@@ -289,7 +345,7 @@ class MobileAppDemo:
         
         # 4. Simular visita completada y generar resumen
         print(f"\n🎉 SIMULANDO VISITA COMPLETADA")
-        print("=" * 50)
+        print(_BANNER)
         
         visited_activities = [
             {"name": "Museo de Arte", "category": "cultural", "duration_hours": 2},
@@ -323,11 +379,10 @@ class MobileAppDemo:
         }
         
         # Guardar reporte
-        with open("mobile_app_demo_report.json", "w", encoding="utf-8") as f:
-            json.dump(mobile_report, f, indent=2, ensure_ascii=False)
+        _write_json_items("mobile_app_demo_report.json", mobile_report.items())
         
         print(f"\n📱 SIMULACIÓN COMPLETADA")
-        print("=" * 50)
+        print(_BANNER)
         print("✅ Todas las funcionalidades de IA funcionaron correctamente")
         print("📊 Reporte guardado en mobile_app_demo_report.json")
         print("🎯 La aplicación está lista para uso en dispositivos móviles")
@@ -335,5 +390,5 @@ class MobileAppDemo:
         return mobile_report
 
 if __name__ == "__main__":
-    app = MobileAppDemo()
+    app = MobileAppDemo(debug=True)
     app.simulate_mobile_app_usage()
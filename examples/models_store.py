@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arrays del modelo de recomendaciones en memoria compartida entre procesos
+El primer proceso publica pesos y features en SharedMemory y escribe un manifiesto;
+los siguientes se adjuntan con vistas numpy, sin una copia propia de los arrays.
+
+El manifiesto es JSON (solo nombres de segmento, formas y dtypes) y vive en un
+directorio privado del usuario; antes de leerlo se comprueban dueño y permisos.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import stat
+import tempfile
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import numpy as np
+
+_FEATURE_KEYS = ('user_features', 'activity_features')
+
+# Segmentos abiertos por este proceso (deben seguir vivos mientras se usen las vistas)
+_segments = []
+_owned = []
+
+
+def _is_private(st) -> bool:
+    """True si el archivo/directorio es del usuario actual y nadie más puede escribirlo ni leerlo"""
+    if not hasattr(os, 'getuid'):
+        return True  # Windows: el directorio temporal ya es propio de cada usuario
+    return st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def _manifest_dir():
+    """
+    Directorio privado (0700) del usuario para los manifiestos
+
+    Returns:
+        Path del directorio, o None si existe pero no es del usuario o es accesible por otros
+    """
+    base = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    suffix = f"_{os.getuid()}" if hasattr(os, 'getuid') else ''
+    path = Path(base) / f"kodotakai_models{suffix}"
+    try:
+        path.mkdir(mode=0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return None
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or not _is_private(st):
+        return None
+    return path
+
+
+def _manifest_path(source: Path):
+    """Ruta del manifiesto asociado a un archivo de modelo (None si no hay directorio seguro)"""
+    directory = _manifest_dir()
+    if directory is None:
+        return None
+    digest = hashlib.sha1(str(source.resolve()).encode('utf-8')).hexdigest()[:12]
+    return directory / f"{digest}.json"
+
+
+def _collect_arrays(model, features):
+    """Arrays a compartir, indexados por nombre"""
+    arrays = {key: features[key] for key in _FEATURE_KEYS}
+    for i, (W, b) in enumerate(zip(model.coefs_, model.intercepts_)):
+        arrays[f'coef_{i}'] = W
+        arrays[f'intercept_{i}'] = b
+    return arrays
+
+
+def _publish(arrays, manifest_path: Path, source_mtime: float):
+    """Copia los arrays a segmentos nuevos y escribe el manifiesto"""
+    entries = {}
+    views = {}
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        _segments.append(shm)
+        _owned.append(shm)
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+        view[...] = array
+        views[key] = view
+        entries[key] = [shm.name, list(array.shape), array.dtype.str]
+
+    if manifest_path is not None:
+        manifest = {'source_mtime': source_mtime, 'arrays': entries}
+        tmp_path = manifest_path.with_suffix(f'.{os.getpid()}.tmp')
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)  # escritura atómica para los demás procesos
+    return views
+
+
+def _attach(manifest_path: Path, source_mtime: float):
+    """
+    Se adjunta a los segmentos publicados por otro proceso
+
+    Returns:
+        Diccionario nombre -> vista numpy, o None si el manifiesto falta, está
+        obsoleto o no es un archivo privado del usuario
+    """
+    if manifest_path is None:
+        return None
+    try:
+        fd = os.open(manifest_path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+    except OSError:
+        return None
+    with open(fd, 'r', encoding='utf-8') as f:
+        if not _is_private(os.fstat(fd)):
+            return None
+        try:
+            manifest = json.load(f)
+        except ValueError:
+            return None
+    if not isinstance(manifest, dict) or manifest.get('source_mtime') != source_mtime:
+        return None
+
+    views = {}
+    attached = []
+    try:
+        for key, (name, shape, dtype) in manifest['arrays'].items():
+            dtype = np.dtype(dtype)
+            if dtype.hasobject:
+                raise ValueError(f"dtype no permitido en memoria compartida: {dtype}")
+            shm = shared_memory.SharedMemory(name=name)
+            if os.name == 'posix':
+                # Antes de Python 3.13 adjuntarse también registra el segmento en el
+                # resource_tracker (con la "/" inicial que shm.name omite), que lo
+                # borraría al salir este proceso
+                resource_tracker.unregister('/' + shm.name, 'shared_memory')
+            attached.append(shm)
+            views[key] = np.ndarray(tuple(shape), dtype=dtype, buffer=shm.buf)
+    except (FileNotFoundError, AttributeError, KeyError, TypeError, ValueError):
+        # El proceso que publicó ya terminó (los segmentos no existen) o el
+        # manifiesto no describe arrays válidos
+        for shm in attached:
+            shm.close()
+        return None
+
+    _segments.extend(attached)
+    return views
+
+
+def share_model_arrays(model, features, source: Path) -> bool:
+    """
+    Reemplaza pesos y features del modelo por vistas en memoria compartida
+
+    Args:
+        model: MLP de sklearn ya cargado
+        features: Diccionario de features de recomendación (se modifica en sitio)
+        source: Archivo del modelo, identifica el manifiesto y detecta cambios
+
+    Returns:
+        True si se reutilizaron segmentos de otro proceso, False si se publicaron nuevos
+    """
+    manifest_path = _manifest_path(source)
+    source_mtime = source.stat().st_mtime
+
+    views = _attach(manifest_path, source_mtime)
+    attached = views is not None
+    if not attached:
+        views = _publish(_collect_arrays(model, features), manifest_path, source_mtime)
+
+    for view in views.values():
+        view.flags.writeable = False
+    for key in _FEATURE_KEYS:
+        features[key] = views[key]
+    model.coefs_ = [views[f'coef_{i}'] for i in range(len(model.coefs_))]
+    model.intercepts_ = [views[f'intercept_{i}'] for i in range(len(model.intercepts_))]
+    return attached
+
+
+def release():
+    """Cierra los segmentos de este proceso y elimina los que publicó"""
+    for shm in _segments:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # aún hay vistas numpy vivas; el SO libera el mapeo al salir
+    for shm in _owned:
+        shm.unlink()
+    _segments.clear()
+    _owned.clear()
+
+
+atexit.register(release)
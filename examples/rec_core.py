@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# cython: boundscheck=False, wraparound=False
+"""
+Núcleo compartido de inferencia de recomendaciones de los ejemplos
+Usado por basic_usage.py y mobile_demo.py; se puede compilar con Cython (ver setup.py)
+"""
+
+import numpy as np
+
+import rec_kernel
+
+try:
+    import cython
+except ImportError:
+    # Sin Cython el módulo es Python puro: las anotaciones de variables
+    # locales (cython.Py_ssize_t, ...) nunca se evalúan en tiempo de ejecución
+    cython = None
+
+# Activaciones ocultas soportadas por MLPClassifier / MLPRegressor
+_ACTIVATIONS = {
+    'relu': lambda x: np.maximum(x, 0),
+    'tanh': np.tanh,
+    'logistic': lambda x: 1.0 / (1.0 + np.exp(-x)),
+    'identity': lambda x: x,
+}
+
+
+def _as_float32(array):
+    """Devuelve el array tal cual si ya es float32 (p. ej. mapeado con mmap) o una copia float32"""
+    if array.dtype == np.float32:
+        return array
+    return array.astype(np.float32)
+
+
+def to_float32(model, features):
+    """
+    Asegura pesos y features en float32 para inferencia (mitad de memoria y ancho de banda)
+
+    train_simple.py ya guarda modelo y features en float32, así que los arrays
+    cargados con mmap_mode='r' se dejan mapeados; solo los modelos guardados
+    en float64 se copian a memoria.
+    """
+    if hasattr(model, 'coefs_'):
+        model.coefs_ = [_as_float32(W) for W in model.coefs_]
+        model.intercepts_ = [_as_float32(b) for b in model.intercepts_]
+    for key in ('user_features', 'activity_features'):
+        features[key] = _as_float32(np.asarray(features[key]))
+
+
+def top_k(predictions, limit):
+    """
+    Índices de las `limit` mejores predicciones, de mayor a menor
+
+    Los empates se resuelven por posición, igual que un sort estable
+    (mismo criterio que hotel_recommendations._top_k).
+
+    Args:
+        predictions: Array 1-D de scores
+        limit: Número de resultados
+
+    Returns:
+        Array de índices ordenado por score descendente
+    """
+    n: cython.Py_ssize_t = len(predictions)
+    k: cython.Py_ssize_t = min(limit, n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    if k < n:
+        threshold = np.partition(predictions, n - k)[n - k]
+        selected = np.flatnonzero(predictions >= threshold)
+    else:
+        selected = np.arange(n)
+    return selected[np.argsort(-predictions[selected], kind='stable')][:k]
+
+
+class RecommendationScorer:
+    """Calcula el score de todas las actividades para un usuario"""
+
+    __slots__ = ('model', 'first_layer', '_activity_features', '_feature_buffer',
+                 '_coefs', '_intercepts', '_activation', '_use_kernel', '_classes')
+
+    def __init__(self, model, features):
+        self.model = model
+        self._activity_features = features['activity_features']
+        self._feature_buffer = None
+        self.first_layer = self._precompute_first_layer()
+
+        # Forward pass especializado: se resuelve aquí todo lo que predict
+        # revisa en cada llamada (validación de entrada, activación, clases)
+        if self.first_layer is not None:
+            self._coefs = tuple(np.ascontiguousarray(W, dtype=np.float32) for W in model.coefs_[1:])
+            self._intercepts = tuple(np.ascontiguousarray(b, dtype=np.float32) for b in model.intercepts_[1:])
+            self._activation = _ACTIVATIONS[model.activation]
+            self._use_kernel = rec_kernel.supports(model)
+            self._classes = getattr(model, 'classes_', None)
+
+    def _precompute_first_layer(self):
+        """
+        Precalcula la parte de la primera capa del MLP que depende solo de las actividades
+
+        Como [usuario || actividad] @ W1 = usuario @ W1[:d_u] + actividad @ W1[d_u:],
+        el término de las actividades (más el sesgo) se calcula una vez y se reutiliza
+        para todos los usuarios.
+
+        Returns:
+            Tuple (W1 de usuario, activity @ W1 de actividad + b1) o None si el modelo
+            no es un MLP de sklearn
+        """
+        if not hasattr(self.model, 'coefs_'):
+            return None
+
+        W1, b1 = self.model.coefs_[0], self.model.intercepts_[0]
+        d_u = W1.shape[0] - self._activity_features.shape[1]
+        return W1[:d_u], self._activity_features @ W1[d_u:] + b1
+
+    def _get_feature_buffer(self, d_u):
+        """Matriz (usuario + actividad) preasignada; las columnas de actividad se rellenan una sola vez"""
+        if self._feature_buffer is None:
+            n_activities, d_a = self._activity_features.shape
+            self._feature_buffer = np.empty((n_activities, d_u + d_a), dtype=np.float32)
+            self._feature_buffer[:, d_u:] = self._activity_features
+        return self._feature_buffer
+
+    def _predict_from_first_layer(self, hidden):
+        """Completa el forward pass del MLP a partir de la pre-activación de la primera capa"""
+        if self._use_kernel:
+            hidden = rec_kernel.forward_from_first_layer(hidden, self._coefs, self._intercepts)
+        else:
+            activation = self._activation
+            for W, b in zip(self._coefs, self._intercepts):
+                hidden = activation(hidden) @ W + b
+
+        # MLPRegressor: la salida es la predicción
+        if self._classes is None:
+            return hidden.ravel()
+        # MLPClassifier: softmax/logística son monótonas, basta con los logits
+        if hidden.shape[1] == 1:
+            return self._classes[(hidden[:, 0] > 0).astype(int)]
+        return self._classes[hidden.argmax(axis=1)]
+
+    def score(self, user_features):
+        """
+        Predice el score de cada actividad para un usuario
+
+        Args:
+            user_features: Vector de features del usuario
+
+        Returns:
+            Array con una predicción por actividad
+        """
+        if self.first_layer is not None:
+            # Solo el término del usuario se calcula por petición
+            W1_user, activity_part = self.first_layer
+            return self._predict_from_first_layer(user_features @ W1_user + activity_part)
+
+        # Modelo genérico: un solo predict sobre el buffer preasignado
+        X = self._get_feature_buffer(len(user_features))
+        X[:, :len(user_features)] = user_features
+        return self.model.predict(X)
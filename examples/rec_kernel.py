@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kernel opcional con Numba para el forward pass del MLP de recomendaciones
+Si Numba no está instalado, AVAILABLE es False y los ejemplos usan el camino NumPy.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    AVAILABLE = False
+else:
+    AVAILABLE = True
+
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _forward_relu(hidden, coefs, intercepts):
+        """Aplica ReLU + capas restantes fila a fila (una actividad por iteración de prange)"""
+        n_layers = len(coefs)
+        n_out = coefs[n_layers - 1].shape[1]
+        out = np.empty((hidden.shape[0], n_out), dtype=np.float32)
+        zero = np.float32(0.0)
+
+        for i in prange(hidden.shape[0]):
+            a = np.maximum(hidden[i], zero)
+            for layer in range(n_layers):
+                W = coefs[layer]
+                z = intercepts[layer].copy()
+                for k in range(W.shape[0]):
+                    a_k = a[k]
+                    if a_k != zero:  # ReLU deja muchas activaciones en cero
+                        for j in range(W.shape[1]):
+                            z[j] += a_k * W[k, j]
+                if layer < n_layers - 1:
+                    a = np.maximum(z, zero)
+                else:
+                    out[i] = z
+        return out
+
+
+def supports(model) -> bool:
+    """Indica si el kernel puede evaluar este modelo (MLP de sklearn con ReLU)"""
+    return AVAILABLE and getattr(model, 'activation', None) == 'relu'
+
+
+def forward_from_first_layer(hidden: np.ndarray, coefs: tuple, intercepts: tuple) -> np.ndarray:
+    """
+    Completa el forward pass del MLP a partir de la pre-activación de la primera capa
+
+    Args:
+        hidden: Pre-activación de la primera capa, shape (N, H1)
+        coefs: Pesos de las capas restantes, float32 contiguos
+        intercepts: Sesgos de las capas restantes, float32 contiguos
+
+    Returns:
+        Salida de la última capa antes de la activación de salida, shape (N, n_out)
+    """
+    return _forward_relu(np.ascontiguousarray(hidden, dtype=np.float32), coefs, intercepts)
@@ -5,23 +5,36 @@ Cliente para Google Maps Places API
 Integración con el sistema de recomendaciones turísticas
 """
 
+import asyncio
+import aiohttp
+import logging
 import requests
-import json
-import time
-from typing import Dict, List, Optional, Any
+import orjson
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Any, Callable, Hashable, Iterable
+from urllib.parse import quote_plus, urlencode
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dataclasses import dataclass
 from datetime import datetime
-import os
-from dotenv import load_dotenv
 from api_cache import APICache
 from config import Config
 
-# Cargar variables de entorno desde .env
-load_dotenv()
+# Mensajes por petición a DEBUG: sin coste de formateo salvo que se active ese nivel
+logger = logging.getLogger(__name__)
 
-@dataclass
+# Respuesta de _make_request cuando la API contesta 304 Not Modified
+NOT_MODIFIED: Dict[str, Any] = {'status': 'NOT_MODIFIED'}
+
+@dataclass(frozen=True)
 class PlaceDetails:
-    """Estructura para almacenar detalles de un lugar"""
+    """Estructura inmutable para almacenar detalles de un lugar"""
+    __slots__ = (
+        'place_id', 'name', 'address', 'rating', 'price_level', 'types', 'photos',
+        'phone_number', 'website', 'opening_hours', 'reviews', 'geometry',
+        'formatted_address', 'business_status'
+    )
     place_id: str
     name: str
     address: str
@@ -36,10 +49,55 @@ class PlaceDetails:
     geometry: Dict[str, Any]
     formatted_address: str
     business_status: str
+    
+    # Con __slots__ y frozen=True, pickle no puede restaurar el estado con setattr
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+    
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
 
 class GoogleMapsPlacesClient:
     """Cliente para interactuar con Google Maps Places API"""
     
+    __slots__ = (
+        'api_key', 'base_url', 'session', 'cache', '_async_session', '_async_loop',
+        '_client_loop', '_client_thread', '_client_session', '_client_loop_lock',
+        '_inflight', '_inflight_lock', '_async_inflight', '_photo_base', '_photo_query',
+        '_max_results', '_request_timeout', '_async_timeout', '_max_concurrent',
+        '_api_calls', '_stats_lock', 'cache_hits'
+    )
+    
+    # Campos escalares de PlaceDetails: (atributo, clave en la respuesta, valor por defecto)
+    _PLACE_FIELDS = (
+        ('place_id', 'place_id', ''),
+        ('name', 'name', ''),
+        ('address', 'formatted_address', ''),
+        ('rating', 'rating', 0.0),
+        ('price_level', 'price_level', 0),
+        ('phone_number', 'formatted_phone_number', ''),
+        ('website', 'website', ''),
+        ('formatted_address', 'formatted_address', ''),
+        ('business_status', 'business_status', 'OPERATIONAL'),
+    )
+    
+    # Máscara de campos por defecto de Place Details: solo lo que usa PlaceDetails.
+    # Los subcampos con '/' evitan descargar p. ej. el viewport de geometry o
+    # los periodos detallados de opening_hours
+    _DETAILS_FIELDS = ','.join((
+        'place_id', 'name', 'formatted_address', 'rating', 'price_level',
+        'types', 'photos', 'formatted_phone_number', 'website',
+        'opening_hours/open_now', 'opening_hours/weekday_text', 'reviews',
+        'geometry/location', 'business_status'
+    ))
+    
+    # Reintentos ante errores transitorios de Google, comunes a las peticiones
+    # síncronas (Retry de urllib3) y asíncronas (_make_request_async)
+    _RETRY_TOTAL = 3
+    _RETRY_BACKOFF = 0.2
+    _RETRY_STATUSES = (429, 500, 502, 503, 504)
+    
     def __init__(self, api_key: str):
         """
         Inicializa el cliente con la API key de Google Maps
@@ -51,52 +109,249 @@ class GoogleMapsPlacesClient:
         self.base_url = "https://maps.googleapis.com/maps/api/place"
         self.session = requests.Session()
         
+        # URL de fotos: base y parámetros fijos (tamaño por defecto) codificados una vez
+        self._photo_base = f"{self.base_url}/photo"
+        self._photo_query = urlencode({'maxwidth': 400, 'maxheight': 400, 'key': api_key})
+        
         # Headers por defecto
         self.session.headers.update({
             'Content-Type': 'application/json',
-            'User-Agent': 'IA-Turistica-Colombia/1.0'
+            'User-Agent': 'IA-Turistica-Colombia/1.0',
+            'Connection': 'keep-alive'
         })
         
+        # Pool de conexiones keep-alive (una conexión TLS reutilizada por host)
+        # y reintentos con backoff ante errores transitorios de Google
+        retry = Retry(
+            total=self._RETRY_TOTAL,
+            backoff_factor=self._RETRY_BACKOFF,
+            status_forcelist=self._RETRY_STATUSES,
+            allowed_methods=frozenset(['GET'])
+        )
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=retry))
+        
+        # Configuración consultada en cada petición, leída una sola vez
+        self._max_results = Config.SEARCH_CONFIG.get('max_results_per_category', 8)
+        self._request_timeout = Config.SEARCH_CONFIG.get('request_timeout', (3.05, 10))
+        self._async_timeout = self._client_timeout(self._request_timeout)
+        self._max_concurrent = Config.SEARCH_CONFIG.get('max_concurrent_requests', 5)
+        
         # Sistema de caché
         self.cache = APICache(
-            duration=Config.SEARCH_CONFIG.get('cache_duration', 3600)
+            duration=Config.SEARCH_CONFIG.get('cache_duration', 3600),
+            details_duration=Config.SEARCH_CONFIG.get('details_cache_duration', 86400 * 7),
+            nearby_duration=Config.SEARCH_CONFIG.get('nearby_cache_duration', 300),
+            max_bytes=Config.SEARCH_CONFIG.get('cache_max_bytes'),
+            stale_duration=Config.SEARCH_CONFIG.get('stale_cache_duration', 86400)
         )
         
-        # Contadores para optimización
-        self.api_calls_made = 0
+        # Peticiones en curso por clave: las llamadas concurrentes con la misma
+        # clave esperan el resultado de la primera en vez de repetir la petición
+        self._inflight: Dict[Hashable, Future] = {}
+        self._inflight_lock = threading.Lock()
+        # Equivalente para las corrutinas: (event loop, clave) -> Task en curso
+        self._async_inflight: Dict[Hashable, asyncio.Task] = {}
+        
+        # Sesión asíncrona compartida (se crea bajo demanda en su event loop)
+        self._async_session = None
+        self._async_loop = None
+        
+        # Event loop propio (en un hilo de fondo) y su sesión para la API síncrona
+        # de batch_place_details; se crean en la primera llamada
+        self._client_loop = None
+        self._client_thread = None
+        self._client_session = None
+        self._client_loop_lock = threading.Lock()
+        
+        # Contadores para optimización (peticiones reales por endpoint y aciertos);
+        # se incrementan bajo lock porque batch y dedup usan varios hilos
+        self._api_calls = dict.fromkeys(('textsearch', 'details', 'nearbysearch'), 0)
         self.cache_hits = 0
+        self._stats_lock = threading.Lock()
+    
+    @property
+    def api_calls_made(self) -> int:
+        """Total de peticiones respondidas por la API"""
+        return sum(self._api_calls.values())
+    
+    def _count_api_call(self, endpoint: str) -> None:
+        """Registra una petición respondida por la API (endpoint como 'details/json')"""
+        name = endpoint.split('/', 1)[0]
+        with self._stats_lock:
+            self._api_calls[name] = self._api_calls.get(name, 0) + 1
+    
+    def _count_cache_hit(self) -> None:
+        """Registra un acierto de caché"""
+        with self._stats_lock:
+            self.cache_hits += 1
     
-    def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _client_timeout(timeout) -> aiohttp.ClientTimeout:
+        """
+        Traduce el request_timeout de requests a aiohttp
+        
+        Args:
+            timeout: Segundos totales o tupla (conexión, lectura) como en requests
+            
+        Returns:
+            ClientTimeout equivalente (el total es la suma de ambos límites)
+        """
+        if isinstance(timeout, (tuple, list)):
+            connect, read = timeout
+            return aiohttp.ClientTimeout(total=connect + read, connect=connect, sock_read=read)
+        return aiohttp.ClientTimeout(total=timeout)
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Espera antes del reintento `attempt` (0 = primero), como el Retry de urllib3
+        
+        Args:
+            attempt: Número de reintentos ya hechos
+            retry_after: Cabecera Retry-After de la respuesta, si la hay
+            
+        Returns:
+            Segundos a esperar
+        """
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass  # formato fecha HTTP: se usa el backoff normal
+        return self._RETRY_BACKOFF * (2 ** attempt)
+    
+    def _make_request(self, endpoint: str, params: Dict[str, Any],
+                      etag: Optional[str] = None) -> Dict[str, Any]:
         """
         Realiza una petición a la API de Google Maps
         
         Args:
             endpoint: Endpoint de la API
             params: Parámetros de la petición
+            etag: ETag de la respuesta en caché; se envía como If-None-Match
             
         Returns:
-            Respuesta de la API como diccionario
+            Respuesta de la API como diccionario (con el ETag recibido en
+            '_etag'), o NOT_MODIFIED si la API confirma que no cambió
         """
         params['key'] = self.api_key
         url = f"{self.base_url}/{endpoint}"
         
         try:
-            response = self.session.get(url, params=params)
+            response = self.session.get(
+                url, params=params,
+                headers={'If-None-Match': etag} if etag else None,
+                timeout=self._request_timeout
+            )
+            
+            # 304: el contenido en caché sigue vigente, no hay cuerpo que parsear
+            if response.status_code == 304:
+                self._count_api_call(endpoint)
+                return NOT_MODIFIED
+            
             response.raise_for_status()
+            self._count_api_call(endpoint)
             
-            data = response.json()
+            # orjson parsea los bytes directamente (sin decodificar a str antes).
+            # Se parsea la respuesta completa aunque luego se usen 8 resultados:
+            # 'status' llega después de 'results' y, con unos 20 resultados, el
+            # parseo toma decenas de microsegundos frente a la latencia de red
+            data = orjson.loads(response.content)
             
             if data.get('status') != 'OK':
-                print(f"⚠️ Error en API: {data.get('status')} - {data.get('error_message', 'Sin mensaje')}")
+                logger.warning("⚠️ Error en API: %s - %s", data.get('status'),
+                               data.get('error_message', 'Sin mensaje'))
                 return {}
             
+            response_etag = response.headers.get('ETag')
+            if response_etag:
+                data['_etag'] = response_etag
             return data
             
         except requests.exceptions.RequestException as e:
-            print(f"❌ Error en petición: {e}")
+            logger.error("❌ Error en petición: %s", e)
             return {}
-        except json.JSONDecodeError as e:
-            print(f"❌ Error decodificando JSON: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error("❌ Error decodificando JSON: %s", e)
+            return {}
+    
+    async def get_async_session(self) -> aiohttp.ClientSession:
+        """
+        Devuelve la sesión HTTP asíncrona compartida, creándola si hace falta
+        
+        La sesión se reutiliza entre llamadas mientras se use el mismo event
+        loop, así las conexiones TCP/TLS con Google se mantienen abiertas. El
+        conector limita las conexiones simultáneas por host para respetar los
+        límites de QPS de Google.
+        
+        Returns:
+            Sesión aiohttp compartida
+        """
+        loop = asyncio.get_running_loop()
+        session = self._async_session
+        if session is None or session.closed or self._async_loop is not loop:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=10),
+                headers={'User-Agent': 'IA-Turistica-Colombia/1.0'}
+            )
+            self._async_session = session
+            self._async_loop = loop
+        return session
+    
+    async def close_async_session(self):
+        """Cierra la sesión HTTP asíncrona compartida"""
+        if self._async_session is not None and not self._async_session.closed:
+            await self._async_session.close()
+        self._async_session = None
+        self._async_loop = None
+    
+    async def _make_request_async(self, session: aiohttp.ClientSession, endpoint: str,
+                                  params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Versión asíncrona de _make_request
+        
+        Args:
+            session: Sesión aiohttp compartida
+            endpoint: Endpoint de la API
+            params: Parámetros de la petición
+            
+        Returns:
+            Respuesta de la API como diccionario
+        """
+        params['key'] = self.api_key
+        url = f"{self.base_url}/{endpoint}"
+        
+        try:
+            # Mismos reintentos que el Retry de la sesión síncrona: errores de
+            # conexión/timeout y respuestas 429/5xx, con backoff exponencial
+            for attempt in range(self._RETRY_TOTAL + 1):
+                can_retry = attempt < self._RETRY_TOTAL
+                try:
+                    async with session.get(url, params=params, timeout=self._async_timeout) as response:
+                        if can_retry and response.status in self._RETRY_STATUSES:
+                            delay = self._retry_delay(attempt, response.headers.get('Retry-After'))
+                        else:
+                            response.raise_for_status()
+                            self._count_api_call(endpoint)
+                            data = orjson.loads(await response.read())
+                            break
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if not can_retry:
+                        raise
+                    delay = self._retry_delay(attempt)
+                await asyncio.sleep(delay)
+            
+            if data.get('status') != 'OK':
+                logger.warning("⚠️ Error en API: %s - %s", data.get('status'),
+                               data.get('error_message', 'Sin mensaje'))
+                return {}
+            
+            return data
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("❌ Error en petición: %s", e)
+            return {}
+        except orjson.JSONDecodeError as e:
+            logger.error("❌ Error decodificando JSON: %s", e)
             return {}
     
     def text_search(self, query: str, location: str = None, radius: int = 50000, 
@@ -121,15 +376,90 @@ class GoogleMapsPlacesClient:
             'language': language
         }
         
+        cached_results = self._get_cached_search(query, location, cache_key_params)
+        if cached_results:
+            return cached_results
+        
+        # Si no está en caché, hacer petición a la API (una sola por búsqueda en curso)
+        def fetch():
+            params = self._build_search_params(query, location, radius, type_filter, language)
+            logger.debug("🔍 Buscando: '%s' en %s", query, location or 'todo el mundo')
+            
+            # Petición condicional si hay una respuesta anterior con ETag
+            etag = self.cache.get_search_etag(query, location, **cache_key_params)
+            data = self._make_request('textsearch/json', params, etag)
+            
+            if data is NOT_MODIFIED:
+                results = self.cache.revalidate_search_results(query, location, **cache_key_params)
+                if results is not None:
+                    logger.debug("🔁 Sin cambios (304), caché renovado para '%s'", query)
+                    return results[:self._max_results]
+                # La entrada desapareció entre la consulta y la respuesta
+                data = self._make_request('textsearch/json', params)
+            
+            return self._store_search_results(query, location, cache_key_params, data)
+        
+        return self._deduplicated(self._search_key(query, location, radius, type_filter, language), fetch)
+    
+    async def text_search_async(self, session: aiohttp.ClientSession, query: str,
+                                location: str = None, radius: int = 50000,
+                                type_filter: str = None, language: str = 'es') -> List[Dict[str, Any]]:
+        """
+        Versión asíncrona de text_search que comparte el mismo caché
+        
+        Args:
+            session: Sesión aiohttp compartida
+            query: Término de búsqueda
+            location: Ubicación para la búsqueda (lat,lng)
+            radius: Radio de búsqueda en metros
+            type_filter: Tipo de lugar
+            language: Idioma de los resultados
+            
+        Returns:
+            Lista de lugares encontrados (máximo 8)
+        """
+        cache_key_params = {
+            'radius': radius,
+            'type_filter': type_filter,
+            'language': language
+        }
+        
+        cached_results = self._get_cached_search(query, location, cache_key_params)
+        if cached_results:
+            return cached_results
+        
+        async def fetch():
+            params = self._build_search_params(query, location, radius, type_filter, language)
+            logger.debug("🔍 Buscando: '%s' en %s", query, location or 'todo el mundo')
+            
+            data = await self._make_request_async(session, 'textsearch/json', params)
+            return self._store_search_results(query, location, cache_key_params, data)
+        
+        key = self._search_key(query, location, radius, type_filter, language)
+        return await self._deduplicated_async(key, fetch)
+    
+    @staticmethod
+    def _search_key(query: str, location: Optional[str], radius: int,
+                    type_filter: Optional[str], language: str) -> Hashable:
+        """Clave de una búsqueda en curso (compartida por la versión síncrona y la asíncrona)"""
+        return ('search', query, location, radius, type_filter, language)
+    
+    def _get_cached_search(self, query: str, location: Optional[str],
+                           cache_key_params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Devuelve los resultados de búsqueda en caché (limitados) o None"""
         cached_results = self.cache.get_search_results(
             query, location, **cache_key_params
         )
         
         if cached_results:
-            self.cache_hits += 1
-            return cached_results[:Config.SEARCH_CONFIG.get('max_results_per_category', 8)]
-        
-        # Si no está en caché, hacer petición a la API
+            self._count_cache_hit()
+            return cached_results[:self._max_results]
+        return None
+    
+    @staticmethod
+    def _build_search_params(query: str, location: Optional[str], radius: int,
+                             type_filter: Optional[str], language: str) -> Dict[str, Any]:
+        """Construye los parámetros de una petición Text Search"""
         params = {
             'query': query,
             'language': language
@@ -142,21 +472,34 @@ class GoogleMapsPlacesClient:
         if type_filter:
             params['type'] = type_filter
         
-        print(f"🔍 Buscando: '{query}' en {location or 'todo el mundo'}")
+        return params
+    
+    def _store_search_results(self, query: str, location: Optional[str],
+                              cache_key_params: Dict[str, Any],
+                              data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Limita los resultados de la API y los almacena en caché"""
+        max_results = self._max_results
+        
+        # La API falló: servir la última búsqueda vencida sin sobrescribirla
+        if not data:
+            stale_results = self.cache.get_search_results_stale(
+                query, location, **cache_key_params
+            )
+            if stale_results:
+                logger.warning("♻️ API no disponible, usando resultados en caché vencidos para '%s'", query)
+                return stale_results[:max_results]
         
-        data = self._make_request('textsearch/json', params)
         results = data.get('results', [])
         
         # Limitar resultados a 8 lugares máximo
-        max_results = Config.SEARCH_CONFIG.get('max_results_per_category', 8)
         results = results[:max_results]
         
         # Almacenar en caché
         self.cache.set_search_results(
-            query, results, location, **cache_key_params
+            query, results, location, etag=data.get('_etag'), **cache_key_params
         )
         
-        print(f"✅ Encontrados {len(results)} lugares (limitado a {max_results})")
+        logger.debug("✅ Encontrados %d lugares (limitado a %d)", len(results), max_results)
         return results
     
     def get_place_details(self, place_id: str, fields: List[str] = None) -> Optional[PlaceDetails]:
@@ -171,71 +514,208 @@ class GoogleMapsPlacesClient:
             Detalles del lugar o None si hay error
         """
         # Verificar caché primero
-        cached_details = self.cache.get_place_details(place_id)
+        cached_details = self._get_cached_place_details(place_id)
         if cached_details:
             return cached_details
         
-        if fields is None:
-            fields = [
-                'place_id', 'name', 'formatted_address', 'rating', 'price_level',
-                'types', 'photos', 'formatted_phone_number', 'website',
-                'opening_hours', 'reviews', 'geometry', 'business_status'
-            ]
+        key = self._details_key(place_id, fields)
+        return self._deduplicated(key, lambda: self._fetch_place_details(place_id, fields))
+    
+    @staticmethod
+    def _details_key(place_id: str, fields: Optional[List[str]]) -> Hashable:
+        """Clave de una petición de detalles en curso (compartida por la versión síncrona y la asíncrona)"""
+        return ('details', place_id, tuple(fields) if fields else None)
+    
+    def _deduplicated(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """
+        Ejecuta fetch() una sola vez por clave entre llamadas concurrentes
+        
+        El primer hilo que llega hace la petición; los demás con la misma clave
+        esperan su resultado. No hace falta timeout de espera: la petición del
+        primer hilo ya está acotada por request_timeout y los reintentos.
         
-        params = {
-            'place_id': place_id,
-            'fields': ','.join(fields),
-            'language': 'es'
-        }
+        Args:
+            key: Identificador de la petición
+            fetch: Función que hace la petición a la API
+            
+        Returns:
+            Resultado de fetch()
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            result = fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+    
+    async def _deduplicated_async(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """
+        Versión asíncrona de _deduplicated: una sola petición por clave en curso
         
-        print(f"📍 Obteniendo detalles del lugar: {place_id}")
+        La primera corrutina crea una Task con fetch(); las demás con la misma
+        clave esperan esa Task. Las Tasks pertenecen a un event loop, así que el
+        mapa se indexa también por loop (el del usuario y el propio del cliente
+        no comparten peticiones).
+        
+        Args:
+            key: Identificador de la petición (mismas claves que _deduplicated)
+            fetch: Función que devuelve la corrutina que hace la petición
+            
+        Returns:
+            Resultado de la corrutina
+        """
+        loop = asyncio.get_running_loop()
+        inflight_key = (loop, key)
+        task = self._async_inflight.get(inflight_key)
+        if task is None:
+            task = loop.create_task(fetch())
+            self._async_inflight[inflight_key] = task
+            task.add_done_callback(lambda _: self._async_inflight.pop(inflight_key, None))
+        # shield: si se cancela una de las corrutinas que esperan, la petición
+        # sigue en curso para las demás
+        return await asyncio.shield(task)
+    
+    def _fetch_place_details(self, place_id: str, fields: List[str] = None) -> Optional[PlaceDetails]:
+        """Pide los detalles de un lugar a la API (sin consultar el caché)"""
+        params = self._build_details_params(place_id, fields)
+        logger.debug("📍 Obteniendo detalles del lugar: %s", place_id)
         
         data = self._make_request('details/json', params)
+        return self._store_place_details(place_id, data) or self._get_stale_place_details(place_id)
+    
+    async def get_place_details_async(self, session: aiohttp.ClientSession, place_id: str,
+                                      fields: List[str] = None) -> Optional[PlaceDetails]:
+        """
+        Versión asíncrona de get_place_details que comparte el mismo caché
+        
+        Args:
+            session: Sesión aiohttp compartida
+            place_id: ID del lugar en Google Maps
+            fields: Campos específicos a obtener
+            
+        Returns:
+            Detalles del lugar o None si hay error
+        """
+        cached_details = self._get_cached_place_details(place_id)
+        if cached_details:
+            return cached_details
+        
+        key = self._details_key(place_id, fields)
+        return await self._deduplicated_async(
+            key, lambda: self._fetch_place_details_async(session, place_id, fields)
+        )
+    
+    async def _fetch_place_details_async(self, session: aiohttp.ClientSession, place_id: str,
+                                         fields: List[str] = None) -> Optional[PlaceDetails]:
+        """Versión asíncrona de _fetch_place_details (sin consultar el caché)"""
+        params = self._build_details_params(place_id, fields)
+        logger.debug("📍 Obteniendo detalles del lugar: %s", place_id)
+        
+        data = await self._make_request_async(session, 'details/json', params)
+        return self._store_place_details(place_id, data) or self._get_stale_place_details(place_id)
+    
+    def _get_cached_place_details(self, place_id: str) -> Optional[PlaceDetails]:
+        """
+        Obtiene los detalles de un lugar desde el caché persistente
+        
+        El caché guarda los detalles como diccionario; se reconstruye el
+        PlaceDetails para que los aciertos sean intercambiables con la API.
+        
+        Args:
+            place_id: ID del lugar en Google Maps
+            
+        Returns:
+            Detalles del lugar o None si no están en caché
+        """
+        cached_details = self.cache.get_place_details(place_id)
+        if not cached_details:
+            return None
+        
+        self._count_cache_hit()
+        return self._to_place_details(cached_details)
+    
+    def _get_stale_place_details(self, place_id: str) -> Optional[PlaceDetails]:
+        """
+        Obtiene los detalles vencidos de un lugar cuando la API falla
+        
+        Args:
+            place_id: ID del lugar en Google Maps
+            
+        Returns:
+            Últimos detalles conocidos o None si no quedan en caché
+        """
+        stale_details = self.cache.get_place_details_stale(place_id)
+        if not stale_details:
+            return None
+        
+        logger.warning("♻️ API no disponible, usando detalles en caché vencidos: %s", place_id)
+        return self._to_place_details(stale_details)
+    
+    @staticmethod
+    def _to_place_details(cached_details: Any) -> PlaceDetails:
+        """Reconstruye un PlaceDetails a partir del diccionario guardado en caché"""
+        if isinstance(cached_details, PlaceDetails):
+            return cached_details
+        return PlaceDetails(**cached_details)
+    
+    @classmethod
+    def _build_details_params(cls, place_id: str, fields: Optional[List[str]]) -> Dict[str, Any]:
+        """Construye los parámetros de una petición Place Details"""
+        return {
+            'place_id': place_id,
+            'fields': cls._DETAILS_FIELDS if fields is None else ','.join(fields),
+            'language': 'es'
+        }
+    
+    def _store_place_details(self, place_id: str, data: Dict[str, Any]) -> Optional[PlaceDetails]:
+        """Convierte la respuesta de Place Details y la almacena en caché"""
         result = data.get('result', {})
         
         if not result:
             return None
         
-        # Procesar fotos
-        photos = []
-        if 'photos' in result:
-            for photo in result['photos'][:5]:  # Máximo 5 fotos
-                photos.append(photo.get('photo_reference', ''))
-        
-        # Procesar reviews
-        reviews = []
-        if 'reviews' in result:
-            for review in result['reviews'][:3]:  # Máximo 3 reviews
-                reviews.append({
-                    'author_name': review.get('author_name', ''),
-                    'rating': review.get('rating', 0),
-                    'text': review.get('text', ''),
-                    'time': review.get('time', 0)
-                })
+        # Máximo 5 fotos y 3 reviews
+        photos = [photo.get('photo_reference', '') for photo in result.get('photos', ())[:5]]
+        reviews = [
+            {
+                'author_name': review.get('author_name', ''),
+                'rating': review.get('rating', 0),
+                'text': review.get('text', ''),
+                'time': review.get('time', 0)
+            }
+            for review in result.get('reviews', ())[:3]
+        ]
         
         # Procesar horarios
-        opening_hours = {}
-        if 'opening_hours' in result:
-            opening_hours = {
-                'open_now': result['opening_hours'].get('open_now', False),
-                'weekday_text': result['opening_hours'].get('weekday_text', [])
-            }
+        hours = result.get('opening_hours')
+        opening_hours = {
+            'open_now': hours.get('open_now', False),
+            'weekday_text': hours.get('weekday_text', [])
+        } if hours is not None else {}
         
+        # Listas y diccionarios por defecto se crean por lugar (no se comparten)
         place_details = PlaceDetails(
-            place_id=result.get('place_id', ''),
-            name=result.get('name', ''),
-            address=result.get('formatted_address', ''),
-            rating=result.get('rating', 0.0),
-            price_level=result.get('price_level', 0),
+            **{attr: result.get(key, default) for attr, key, default in self._PLACE_FIELDS},
             types=result.get('types', []),
             photos=photos,
-            phone_number=result.get('formatted_phone_number', ''),
-            website=result.get('website', ''),
             opening_hours=opening_hours,
             reviews=reviews,
-            geometry=result.get('geometry', {}),
-            formatted_address=result.get('formatted_address', ''),
-            business_status=result.get('business_status', 'OPERATIONAL')
+            geometry=result.get('geometry', {})
         )
         
         # Almacenar en caché
@@ -269,12 +749,30 @@ class GoogleMapsPlacesClient:
         if keyword:
             params['keyword'] = keyword
         
-        print(f"🗺️ Buscando lugares cercanos a {location}")
+        cache_key_params = {
+            'radius': radius,
+            'type_filter': type_filter,
+            'keyword': keyword
+        }
+        cached_results = self.cache.get_nearby_results(location, **cache_key_params)
+        if cached_results:
+            self._count_cache_hit()
+            return cached_results
+        
+        logger.debug("🗺️ Buscando lugares cercanos a %s", location)
         
         data = self._make_request('nearbysearch/json', params)
         results = data.get('results', [])
+        if results:
+            self.cache.set_nearby_results(location, results, **cache_key_params)
+        elif not data:
+            # La API falló: servir la última búsqueda vencida si existe
+            stale_results = self.cache.get_nearby_results_stale(location, **cache_key_params)
+            if stale_results:
+                logger.warning("♻️ API no disponible, usando resultados en caché vencidos cerca de %s", location)
+                return stale_results
         
-        print(f"✅ Encontrados {len(results)} lugares cercanos")
+        logger.debug("✅ Encontrados %d lugares cercanos", len(results))
         return results
     
     def get_photo_url(self, photo_reference: str, max_width: int = 400, 
@@ -293,147 +791,305 @@ class GoogleMapsPlacesClient:
         if not photo_reference:
             return ""
         
+        # La referencia se escapa: puede contener caracteres como '+' o '='
+        if max_width == 400 and max_height == 400:
+            return f"{self._photo_base}?photo_reference={quote_plus(photo_reference)}&{self._photo_query}"
+        
         params = {
             'photo_reference': photo_reference,
             'maxwidth': max_width,
             'maxheight': max_height,
             'key': self.api_key
         }
-        
-        return f"{self.base_url}/photo?{'&'.join([f'{k}={v}' for k, v in params.items()])}"
+        return f"{self._photo_base}?{urlencode(params)}"
     
     def batch_place_details(self, place_ids: List[str], 
                            delay: float = None) -> List[PlaceDetails]:
         """
         Obtiene detalles de múltiples lugares con optimización de caché
         
+        Los aciertos de caché se resuelven primero; los fallos se piden a la
+        API en paralelo, con un semáforo que limita las peticiones simultáneas
+        en lugar de dormir entre peticiones.
+        
         Args:
             place_ids: Lista de IDs de lugares (máximo 8)
-            delay: Delay entre peticiones en segundos
+            delay: Sin uso; se conserva por compatibilidad
             
         Returns:
             Lista de detalles de lugares
         """
-        if delay is None:
-            delay = Config.SEARCH_CONFIG.get('delay_between_requests', 0.1)
-        
         # Limitar a 8 lugares máximo
-        max_places = Config.SEARCH_CONFIG.get('max_results_per_category', 8)
+        max_places = self._max_results
         place_ids = place_ids[:max_places]
         
-        details = []
-        batch_size = Config.SEARCH_CONFIG.get('batch_size', 3)
+        # Resolver primero los aciertos de caché
+        found = {}
+        for place_id in place_ids:
+            cached_details = self._get_cached_place_details(place_id)
+            if cached_details:
+                found[place_id] = cached_details
         
-        # Procesar en lotes pequeños
-        for i in range(0, len(place_ids), batch_size):
-            batch = place_ids[i:i + batch_size]
+        misses = [place_id for place_id in place_ids if place_id not in found]
+        if found:
+            logger.debug("💾 %d/%d lugares obtenidos del caché", len(found), len(place_ids))
+        
+        if misses:
+            logger.debug("📊 Procesando %d lugares en paralelo...", len(misses))
+            # Se ejecuta en el loop propio del cliente: funciona también si quien
+            # llama ya está dentro de un event loop, y la sesión se reutiliza
+            fetched = asyncio.run_coroutine_threadsafe(
+                self._fetch_details_concurrently(misses), self._get_client_loop()
+            ).result()
             
-            for j, place_id in enumerate(batch):
-                print(f"📊 Procesando lugar {i+j+1}/{len(place_ids)}: {place_id[:20]}...")
-                
-                place_details = self.get_place_details(place_id)
+            for place_id, place_details in zip(misses, fetched):
                 if place_details:
-                    details.append(place_details)
-                
-                # Delay optimizado entre peticiones
-                if j < len(batch) - 1:
-                    time.sleep(delay)
+                    found[place_id] = place_details
+        
+        # Mantener el orden original de los IDs
+        return [found[place_id] for place_id in place_ids if place_id in found]
+    
+    async def _fetch_details_concurrently(self, place_ids: List[str]) -> List[Optional[PlaceDetails]]:
+        """
+        Pide a la API los detalles de varios lugares a la vez
+        
+        Se ejecuta en el loop propio del cliente (ver _get_client_loop) con su
+        sesión aiohttp, que se conserva entre llamadas.
+        
+        Args:
+            place_ids: IDs de lugares que no están en caché
+            
+        Returns:
+            Detalles (o None) en el mismo orden de entrada
+        """
+        max_concurrent = self._max_concurrent
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        session = self._client_session
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=max_concurrent),
+                headers={'User-Agent': 'IA-Turistica-Colombia/1.0'}
+            )
+            self._client_session = session
+        
+        async def fetch(place_id):
+            async with semaphore:
+                return await self._deduplicated_async(
+                    self._details_key(place_id, None),
+                    lambda: self._fetch_place_details_async(session, place_id)
+                )
+        
+        return await asyncio.gather(*(fetch(place_id) for place_id in place_ids))
+    
+    def _get_client_loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop propio del cliente, en un hilo de fondo creado bajo demanda"""
+        with self._client_loop_lock:
+            if self._client_loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='gmaps-client-loop', daemon=True)
+                thread.start()
+                self._client_loop = loop
+                self._client_thread = thread
+            return self._client_loop
+    
+    def close(self):
+        """Cierra las sesiones HTTP del cliente y su event loop propio"""
+        with self._client_loop_lock:
+            loop = self._client_loop
+            if loop is not None:
+                if self._client_session is not None:
+                    asyncio.run_coroutine_threadsafe(self._client_session.close(), loop).result()
+                loop.call_soon_threadsafe(loop.stop)
+                self._client_thread.join()
+                loop.close()
+            self._client_loop = None
+            self._client_thread = None
+            self._client_session = None
+        self.session.close()
+    
+    async def batch_place_details_async(self, session: aiohttp.ClientSession,
+                                        place_ids: List[str]) -> List[PlaceDetails]:
+        """
+        Obtiene detalles de múltiples lugares de forma concurrente
+        
+        El límite de conexiones por host de la sesión sustituye a los delays
+        de la versión síncrona. Un lugar que ya se está pidiendo (repetido en
+        la lista o pedido por otra corrutina) se espera en vez de pedirse otra vez.
+        
+        Args:
+            session: Sesión aiohttp compartida
+            place_ids: Lista de IDs de lugares (máximo 8)
             
-            # Delay entre lotes
-            if i + batch_size < len(place_ids):
-                time.sleep(delay * 2)
+        Returns:
+            Lista de detalles de lugares (en el mismo orden de entrada)
+        """
+        max_places = self._max_results
+        place_ids = place_ids[:max_places]
+        
+        logger.debug("📊 Procesando %d lugares en paralelo...", len(place_ids))
+        results = await asyncio.gather(
+            *(self.get_place_details_async(session, place_id) for place_id in place_ids)
+        )
         
-        return details
+        return [place_details for place_details in results if place_details]
     
     def get_optimization_stats(self) -> Dict[str, Any]:
         """Obtiene estadísticas de optimización de API"""
         cache_stats = self.cache.get_cache_stats()
         
+        with self._stats_lock:
+            api_calls = dict(self._api_calls)
+            cache_hits = self.cache_hits
+        api_calls_made = sum(api_calls.values())
+        
         return {
-            'api_calls_made': self.api_calls_made,
-            'cache_hits': self.cache_hits,
-            'cache_hit_ratio': (self.cache_hits / max(self.api_calls_made + self.cache_hits, 1)) * 100,
+            'api_calls_made': api_calls_made,
+            'api_calls_by_endpoint': api_calls,
+            'cache_hits': cache_hits,
+            'cache_hit_ratio': (cache_hits / max(api_calls_made + cache_hits, 1)) * 100,
             'cache_stats': cache_stats,
-            'optimization_level': 'high' if self.cache_hits > self.api_calls_made else 'medium'
+            'optimization_level': 'high' if cache_hits > api_calls_made else 'medium'
         }
     
     def clear_cache(self):
         """Limpia el caché del cliente"""
         self.cache.clear_all_cache()
-        self.api_calls_made = 0
-        self.cache_hits = 0
+        with self._stats_lock:
+            self._api_calls = dict.fromkeys(self._api_calls, 0)
+            self.cache_hits = 0
         print("🧹 Caché del cliente limpiado")
 
 class PlacesDataExporter:
     """Exportador de datos de Google Places a JSON"""
     
+    __slots__ = ('client',)
+    
     def __init__(self, client: GoogleMapsPlacesClient):
         self.client = client
     
-    def export_places_to_json(self, places: List[PlaceDetails], 
+    def _place_to_dict(self, place: PlaceDetails, exported_at: str) -> Dict[str, Any]:
+        """
+        Convierte un lugar al formato de exportación
+        
+        Args:
+            place: Detalles del lugar
+            exported_at: Fecha de exportación (ISO)
+            
+        Returns:
+            Diccionario serializable del lugar
+        """
+        get_photo_url = self.client.get_photo_url
+        
+        return {
+            "id": place.place_id,
+            "name": place.name,
+            "address": place.address,
+            "formatted_address": place.formatted_address,
+            "rating": place.rating,
+            "price_level": place.price_level,
+            "types": place.types,
+            "phone": place.phone_number,
+            "website": place.website,
+            "photos": [get_photo_url(photo_ref) for photo_ref in place.photos],
+            "opening_hours": place.opening_hours,
+            "reviews": place.reviews,
+            "geometry": place.geometry,
+            "business_status": place.business_status,
+            "export_timestamp": exported_at
+        }
+    
+    @staticmethod
+    def _export_metadata(exported_at: str, total_places: int) -> Dict[str, Any]:
+        """Metadatos de una exportación"""
+        return {
+            "exported_at": exported_at,
+            "total_places": total_places,
+            "source": "Google Maps Places API",
+            "version": "1.0"
+        }
+    
+    def export_places_to_json(self, places: Iterable[PlaceDetails], 
                              filename: str = None) -> Dict[str, Any]:
         """
         Exporta lugares a formato JSON estructurado
         
+        Con ``filename`` los lugares se escriben uno a uno a medida que se
+        recorren, sin acumular la exportación completa en memoria; los
+        metadatos van al final porque el total se conoce al terminar.
+        
         Args:
-            places: Lista de detalles de lugares
+            places: Lugares a exportar (lista o cualquier iterable)
             filename: Nombre del archivo (opcional)
             
         Returns:
-            Diccionario con datos estructurados
-        """
-        export_data = {
-            "metadata": {
-                "exported_at": datetime.now().isoformat(),
-                "total_places": len(places),
-                "source": "Google Maps Places API",
-                "version": "1.0"
-            },
-            "places": []
-        }
+            Diccionario con datos estructurados (al escribir un archivo,
+            solo los metadatos)
+        """
+        exported_at = datetime.now().isoformat()
         
-        for place in places:
-            # Generar URLs de fotos
-            photo_urls = []
-            for photo_ref in place.photos:
-                photo_url = self.client.get_photo_url(photo_ref)
-                photo_urls.append(photo_url)
-            
-            place_data = {
-                "id": place.place_id,
-                "name": place.name,
-                "address": place.address,
-                "formatted_address": place.formatted_address,
-                "rating": place.rating,
-                "price_level": place.price_level,
-                "types": place.types,
-                "phone": place.phone_number,
-                "website": place.website,
-                "photos": photo_urls,
-                "opening_hours": place.opening_hours,
-                "reviews": place.reviews,
-                "geometry": place.geometry,
-                "business_status": place.business_status,
-                "export_timestamp": datetime.now().isoformat()
+        if not filename:
+            places_data = [self._place_to_dict(place, exported_at) for place in places]
+            return {
+                "metadata": self._export_metadata(exported_at, len(places_data)),
+                "places": places_data
             }
+        
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        total_places = 0
+        with open(filename, 'wb') as f:
+            f.write(b'{\n  "places": [')
+            for place in places:
+                f.write(b',\n    ' if total_places else b'\n    ')
+                place_json = orjson.dumps(self._place_to_dict(place, exported_at), option=option)
+                f.write(place_json.replace(b'\n', b'\n    '))
+                total_places += 1
+            f.write(b'\n  ],\n' if total_places else b'],\n')
             
-            export_data["places"].append(place_data)
+            metadata = self._export_metadata(exported_at, total_places)
+            f.write(b'  "metadata": ')
+            f.write(orjson.dumps(metadata, option=option).replace(b'\n', b'\n  '))
+            f.write(b'\n}')
+        
+        print(f"💾 Datos exportados a: {filename}")
+        return {"metadata": metadata}
+    
+    def export_places_to_ndjson(self, places: Iterable[PlaceDetails], filename: str) -> int:
+        """
+        Exporta lugares en formato NDJSON (un objeto JSON por línea)
         
-        # Guardar archivo si se especifica
-        if filename:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
-            print(f"💾 Datos exportados a: {filename}")
+        Cada lugar se serializa y escribe por separado, de modo que la memoria
+        usada no depende del número de lugares.
         
-        return export_data
+        Args:
+            places: Lugares a exportar (lista o cualquier iterable)
+            filename: Nombre del archivo
+            
+        Returns:
+            Número de lugares exportados
+        """
+        exported_at = datetime.now().isoformat()
+        total_places = 0
+        
+        with open(filename, 'wb') as f:
+            for place in places:
+                f.write(orjson.dumps(self._place_to_dict(place, exported_at),
+                                     option=orjson.OPT_NON_STR_KEYS))
+                f.write(b'\n')
+                total_places += 1
+        
+        print(f"💾 {total_places} lugares exportados a: {filename}")
+        return total_places
 
 def main():
     """Función de demostración"""
     print("🗺️ Cliente Google Maps Places API - IA Turística Colombia")
     print("="*60)
     
-    # Obtener API key del entorno
-    api_key = os.getenv('GOOGLE_MAPS_API_KEY')
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    
+    # Obtener API key del entorno (leída en config.py)
+    api_key = Config.GOOGLE_MAPS_API_KEY
     if not api_key:
         print("❌ Error: No se encontró GOOGLE_MAPS_API_KEY en las variables de entorno")
         print("💡 Configura tu API key con: export GOOGLE_MAPS_API_KEY='tu_api_key'")
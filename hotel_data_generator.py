@@ -5,13 +5,13 @@ Generador de datos fake para hoteles en Colombia
 Crea datos de prueba realistas para el sistema de recomendaciones
 """
 
-import json
-import random
+import numpy as np
+import orjson
 from datetime import datetime
 from pathlib import Path
 
 class HotelDataGenerator:
-    def __init__(self):
+    def __init__(self, seed=None):
         self.hotel_names = [
             "Hotel Plaza Sincelejo", "Hotel Sucre Real", "Hotel Costa Caribe",
             "Hotel Colonial", "Hotel Los Almendros", "Hotel San Francisco",
@@ -31,108 +31,191 @@ class HotelDataGenerator:
         self.hotel_categories = ["Económico", "Medio", "Lujo", "Boutique", "Ecológico"]
         
         self.room_types = ["Sencilla", "Doble", "Suite", "Familiar", "Ejecutiva"]
+        
+        # Generador NumPy: los datos se sortean por columnas completas
+        # (seed opcional para generar siempre el mismo conjunto)
+        self.rng = np.random.default_rng(seed)
+
+    def _choice(self, options, n):
+        """Elige n valores de options con reemplazo (un solo sorteo vectorizado)"""
+        return [options[j] for j in self.rng.integers(0, len(options), n).tolist()]
+
+    def _sample(self, options, min_k, max_k, n):
+        """
+        Genera n muestras sin reemplazo de options, cada una de tamaño entre min_k y max_k
+
+        Args:
+            options: Lista de valores posibles
+            min_k: Tamaño mínimo de cada muestra
+            max_k: Tamaño máximo de cada muestra (inclusive)
+            n: Número de muestras
+
+        Returns:
+            Lista de n listas
+        """
+        sizes = self.rng.integers(min_k, max_k + 1, n).tolist()
+        # Una permutación independiente por fila en un solo llamado (Generator.permuted);
+        # solo hacen falta las primeras max_k posiciones
+        m = len(options)
+        orders = self.rng.permuted(np.broadcast_to(np.arange(m), (n, m)), axis=1)
+        rows = np.array(options, dtype=object)[orders[:, :max_k]].tolist()
+        return [row[:k] for row, k in zip(rows, sizes)]
 
     def generate_hotel_data(self, num_hotels=20):
         """Genera datos fake de hoteles"""
-        hotels = []
-        
-        for i in range(num_hotels):
-            hotel = {
-                "id": i + 1,
-                "name": random.choice(self.hotel_names),
-                "city": random.choice(self.cities),
-                "category": random.choice(self.hotel_categories),
-                "rating": round(random.uniform(3.0, 5.0), 1),
-                "price_per_night": random.randint(50000, 500000),
-                "amenities": random.sample(self.amenities, random.randint(3, 8)),
-                "room_types": random.sample(self.room_types, random.randint(2, 4)),
-                "total_rooms": random.randint(20, 150),
-                "available_rooms": random.randint(5, 50),
+        n = num_hotels
+        rng = self.rng
+        created_at = datetime.now().isoformat()  # una sola vez por lote
+
+        # Un sorteo por columna en lugar de ~15 llamadas a random por hotel
+        names = self._choice(self.hotel_names, n)
+        cities = self._choice(self.cities, n)
+        categories = self._choice(self.hotel_categories, n)
+        ratings = np.round(rng.uniform(3.0, 5.0, n), 1).tolist()
+        prices = rng.integers(50000, 500001, n).tolist()
+        amenities = self._sample(self.amenities, 3, 8, n)
+        room_types = self._sample(self.room_types, 2, 4, n)
+        total_rooms = rng.integers(20, 151, n).tolist()
+        available_rooms = rng.integers(5, 51, n).tolist()
+        latitudes = np.round(rng.uniform(9.0, 10.0, n), 6).tolist()
+        longitudes = np.round(rng.uniform(-75.0, -74.0, n), 6).tolist()
+        streets = rng.integers(1, 101, n).tolist()
+        numbers = rng.integers(1, 51, n).tolist()
+        suffixes = rng.integers(10, 100, n).tolist()
+        phone_prefixes = rng.integers(300, 400, n).tolist()
+        phone_numbers = rng.integers(1000000, 10000000, n).tolist()
+        styles = self._choice(['moderno', 'tradicional', 'elegante', 'acogedor'], n)
+        description_cities = self._choice(self.cities, n)
+        features = self._choice(['vistas al mar', 'jardines tropicales', 'arquitectura colonial', 'diseño contemporáneo'], n)
+
+        # Filas armadas recorriendo las columnas con zip (sin indexar cada lista por fila)
+        return [
+            {
+                "id": hotel_id,
+                "name": name,
+                "city": city,
+                "category": category,
+                "rating": rating,
+                "price_per_night": price,
+                "amenities": hotel_amenities,
+                "room_types": hotel_room_types,
+                "total_rooms": rooms,
+                "available_rooms": available,
                 "location": {
-                    "latitude": round(random.uniform(9.0, 10.0), 6),
-                    "longitude": round(random.uniform(-75.0, -74.0), 6),
-                    "address": f"Calle {random.randint(1, 100)} #{random.randint(1, 50)}-{random.randint(10, 99)}"
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "address": f"Calle {street} #{number}-{suffix}"
                 },
                 "contact": {
-                    "phone": f"+57 {random.randint(300, 399)} {random.randint(1000000, 9999999)}",
-                    "email": f"info@hotel{i+1}.com"
+                    "phone": f"+57 {phone_prefix} {phone_number}",
+                    "email": f"info@hotel{hotel_id}.com"
                 },
-                "description": f"Hotel {random.choice(['moderno', 'tradicional', 'elegante', 'acogedor'])} en {random.choice(self.cities)} con {random.choice(['vistas al mar', 'jardines tropicales', 'arquitectura colonial', 'diseño contemporáneo'])}",
-                "created_at": datetime.now().isoformat()
+                "description": f"Hotel {style} en {description_city} con {feature}",
+                "created_at": created_at
             }
-            hotels.append(hotel)
-        
-        return hotels
+            for (hotel_id, name, city, category, rating, price, hotel_amenities,
+                 hotel_room_types, rooms, available, latitude, longitude, street, number,
+                 suffix, phone_prefix, phone_number, style, description_city, feature)
+            in zip(range(1, n + 1), names, cities, categories, ratings, prices, amenities,
+                   room_types, total_rooms, available_rooms, latitudes, longitudes, streets,
+                   numbers, suffixes, phone_prefixes, phone_numbers, styles,
+                   description_cities, features)
+        ]
 
     def generate_user_profiles(self, num_users=10):
         """Genera perfiles de usuarios fake"""
-        users = []
-        
+        n = num_users
+        rng = self.rng
+        created_at = datetime.now().isoformat()  # una sola vez por lote
+
         travel_styles = ["cultural", "aventura", "relajado", "familiar", "negocios"]
         budget_ranges = ["económico", "medio", "alto"]
-        
-        for i in range(num_users):
-            user = {
-                "user_id": i + 1,
-                "name": f"Usuario {i + 1}",
-                "age": random.randint(18, 65),
-                "travel_style": random.choice(travel_styles),
-                "budget_range": random.choice(budget_ranges),
+
+        ages = rng.integers(18, 66, n).tolist()
+        styles = self._choice(travel_styles, n)
+        budgets = self._choice(budget_ranges, n)
+        amenities = self._sample(self.amenities, 2, 5, n)
+        room_types = self._choice(self.room_types, n)
+        max_prices = rng.integers(100000, 600001, n).tolist()
+        min_ratings = np.round(rng.uniform(3.0, 4.5, n), 1).tolist()
+        location_preferences = self._sample(self.cities, 1, 3, n)
+
+        return [
+            {
+                "user_id": user_id,
+                "name": f"Usuario {user_id}",
+                "age": age,
+                "travel_style": style,
+                "budget_range": budget,
                 "preferences": {
-                    "amenities": random.sample(self.amenities, random.randint(2, 5)),
-                    "room_type": random.choice(self.room_types),
-                    "max_price": random.randint(100000, 600000),
-                    "min_rating": round(random.uniform(3.0, 4.5), 1)
+                    "amenities": user_amenities,
+                    "room_type": room_type,
+                    "max_price": max_price,
+                    "min_rating": min_rating
                 },
-                "location_preferences": random.sample(self.cities, random.randint(1, 3)),
-                "created_at": datetime.now().isoformat()
+                "location_preferences": cities,
+                "created_at": created_at
             }
-            users.append(user)
-        
-        return users
+            for (user_id, age, style, budget, user_amenities, room_type, max_price,
+                 min_rating, cities)
+            in zip(range(1, n + 1), ages, styles, budgets, amenities, room_types,
+                   max_prices, min_ratings, location_preferences)
+        ]
 
     def generate_booking_history(self, users, hotels, num_bookings=50):
         """Genera historial de reservas fake"""
-        bookings = []
-        
-        for i in range(num_bookings):
-            user = random.choice(users)
-            hotel = random.choice(hotels)
-            
-            booking = {
-                "booking_id": i + 1,
+        n = num_bookings
+        rng = self.rng
+        now = datetime.now()  # una sola vez por lote
+        created_at = now.isoformat()
+        today = now.strftime("%Y-%m-%d")
+
+        booking_users = self._choice(users, n)
+        booking_hotels = self._choice(hotels, n)
+        nights = rng.integers(1, 8, n).tolist()
+        guests = rng.integers(1, 5, n).tolist()
+        price_multipliers = rng.integers(1, 8, n).tolist()
+        ratings = rng.integers(1, 6, n).tolist()
+        reviews = self._choice([
+            "Excelente servicio y ubicación",
+            "Muy cómodo y limpio",
+            "Personal muy amable",
+            "Buen precio por la calidad",
+            "Recomendado para familias"
+        ], n)
+
+        return [
+            {
+                "booking_id": booking_id,
                 "user_id": user["user_id"],
                 "hotel_id": hotel["id"],
-                "check_in": datetime.now().strftime("%Y-%m-%d"),
-                "check_out": datetime.now().strftime("%Y-%m-%d"),
-                "nights": random.randint(1, 7),
-                "guests": random.randint(1, 4),
-                "total_price": hotel["price_per_night"] * random.randint(1, 7),
-                "rating_given": random.randint(1, 5),
-                "review": random.choice([
-                    "Excelente servicio y ubicación",
-                    "Muy cómodo y limpio",
-                    "Personal muy amable",
-                    "Buen precio por la calidad",
-                    "Recomendado para familias"
-                ]),
-                "created_at": datetime.now().isoformat()
+                "check_in": today,
+                "check_out": today,
+                "nights": booking_nights,
+                "guests": booking_guests,
+                "total_price": hotel["price_per_night"] * multiplier,
+                "rating_given": rating,
+                "review": review,
+                "created_at": created_at
             }
-            bookings.append(booking)
-        
-        return bookings
+            for (booking_id, user, hotel, booking_nights, booking_guests, multiplier,
+                 rating, review)
+            in zip(range(1, n + 1), booking_users, booking_hotels, nights, guests,
+                   price_multipliers, ratings, reviews)
+        ]
 
-    def save_fake_data(self, output_file="data/fake_hotel_data.json"):
-        """Genera y guarda todos los datos fake"""
+    def save_fake_data(self, output_file="data/fake_hotel_data.json",
+                       num_hotels=20, num_users=10, num_bookings=50):
+        """Genera y guarda todos los datos fake (los tamaños se pueden subir para pruebas de carga)"""
         print("🏨 Generando datos fake de hoteles...")
         
         # Crear directorio si no existe
         Path(output_file).parent.mkdir(parents=True, exist_ok=True)
         
         # Generar datos
-        hotels = self.generate_hotel_data(20)
-        users = self.generate_user_profiles(10)
-        bookings = self.generate_booking_history(users, hotels, 50)
+        hotels = self.generate_hotel_data(num_hotels)
+        users = self.generate_user_profiles(num_users)
+        bookings = self.generate_booking_history(users, hotels, num_bookings)
         
         # Crear estructura completa
         fake_data = {
@@ -149,8 +232,8 @@ class HotelDataGenerator:
         }
         
         # Guardar archivo
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(fake_data, f, ensure_ascii=False, indent=2)
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(fake_data, option=orjson.OPT_INDENT_2))
         
         print(f"✅ Datos fake guardados en: {output_file}")
         print(f"📊 Resumen:")
@@ -165,7 +248,7 @@ if __name__ == "__main__":
     fake_data = generator.save_fake_data()
     
     print("\n🎯 Ejemplo de hotel generado:")
-    print(json.dumps(fake_data["hotels"][0], indent=2, ensure_ascii=False))
+    print(orjson.dumps(fake_data["hotels"][0], option=orjson.OPT_INDENT_2).decode())
 
 
 
@@ -10,20 +10,73 @@ import numpy as np
 from pathlib import Path
 from datetime import datetime
 from hotel_data_generator import HotelDataGenerator
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor
 from sklearn.preprocessing import LabelEncoder
 import joblib
 
+try:
+    import lz4  # noqa: F401 - backend de compresión rápido para joblib
+except ImportError:
+    _JOBLIB_COMPRESS = 3  # zlib
+else:
+    _JOBLIB_COMPRESS = ('lz4', 3)
+
+# Amenidades y categorías que se codifican como indicadores (el orden define las columnas)
+_KEY_AMENITIES = ("Piscina", "WiFi gratuito", "Restaurante", "Spa")
+_TRAVEL_STYLES = ("cultural", "aventura", "relajado", "familiar", "negocios")
+_BUDGET_RANGES = ("económico", "medio", "alto")
+
+
+def _column(rows, key):
+    """Extrae el campo `key` de cada diccionario como un array float64"""
+    return np.fromiter((row[key] for row in rows), dtype=np.float64, count=len(rows))
+
+
+def _top_k(scores, limit):
+    """
+    Índices de los `limit` mejores scores, de mayor a menor
+    
+    np.partition encuentra el umbral en O(n) y solo se ordenan los que lo
+    superan; los empates se resuelven por posición, igual que un sort estable.
+    
+    Args:
+        scores: Array 1-D de scores
+        limit: Número de resultados
+    
+    Returns:
+        Array de índices ordenado por score descendente
+    """
+    n = len(scores)
+    if limit <= 0 or n == 0:
+        return np.zeros(0, dtype=np.intp)
+    if limit < n:
+        threshold = np.partition(scores, n - limit)[n - limit]
+        selected = np.flatnonzero(scores >= threshold)
+    else:
+        selected = np.arange(n)
+    return selected[np.argsort(-scores[selected], kind="stable")][:limit]
+
+
 class HotelRecommendationSystem:
-    def __init__(self):
+    def __init__(self, seed=42):
         self.data_file = "data/fake_hotel_data.json"
         self.models_dir = Path("models/hotel_recommendations")
         self.models_dir.mkdir(parents=True, exist_ok=True)
         
+        # Generador NumPy para el ruido de los ratings sintéticos (reproducible)
+        self.rng = np.random.default_rng(seed)
+        
         # Cargar o generar datos
         self.hotels = []
         self.users = []
         self.bookings = []
+        self._features_cache = None
+        self._predict_buffer = None
+        self.amenity_bits = {}
+        self.hotel_masks = np.zeros(0, dtype=np.uint64)
+        self.hotel_prices = np.zeros(0)
+        self.hotel_ratings = np.zeros(0)
+        self.hotel_avail = np.zeros(0)
         self.load_data()
         
         # Modelos
@@ -32,6 +85,7 @@ class HotelRecommendationSystem:
         
     def load_data(self):
         """Carga datos fake o los genera si no existen"""
+        self._features_cache = None  # Las features dependen de los datos cargados
         if Path(self.data_file).exists():
             print("📂 Cargando datos existentes...")
             with open(self.data_file, 'r', encoding='utf-8') as f:
@@ -46,48 +100,89 @@ class HotelRecommendationSystem:
             self.hotels = data["hotels"]
             self.users = data["users"]
             self.bookings = data["bookings"]
+        
+        # Columnas usadas para filtrar hoteles sin recorrer los diccionarios
+        self.hotel_prices = _column(self.hotels, "price_per_night")
+        self.hotel_ratings = _column(self.hotels, "rating")
+        self.hotel_avail = _column(self.hotels, "available_rooms")
+        self._index_amenities()
+    
+    def _index_amenities(self):
+        """
+        Codifica las amenidades de cada hotel como una máscara de bits uint64
+        
+        Cada amenidad distinta recibe un bit (amenity_bits); así "hotel tiene X"
+        es un AND sobre toda la columna hotel_masks en vez de recorrer listas.
+        """
+        names = sorted({amenity for hotel in self.hotels for amenity in hotel["amenities"]})
+        if len(names) > 64:
+            raise ValueError(f"Demasiadas amenidades distintas para una máscara uint64: {len(names)}")
+        
+        self.amenity_bits = {name: bit for bit, name in enumerate(names)}
+        masks = []
+        for hotel in self.hotels:
+            mask = 0
+            for amenity in hotel["amenities"]:
+                mask |= 1 << self.amenity_bits[amenity]
+            masks.append(mask)
+        self.hotel_masks = np.array(masks, dtype=np.uint64)
+    
+    def _amenity_column(self, amenity):
+        """Indicador booleano de la amenidad para todos los hoteles"""
+        bit = self.amenity_bits.get(amenity)
+        if bit is None:
+            return np.zeros(len(self.hotel_masks), dtype=bool)
+        return (self.hotel_masks & np.uint64(1 << bit)) != 0
     
     def prepare_features(self):
-        """Prepara características para el modelo de recomendaciones"""
+        """
+        Prepara características para el modelo de recomendaciones
+        
+        Las matrices se calculan una sola vez y se reutilizan; load_data invalida la caché.
+        
+        Returns:
+            Tuple (features de hoteles, features de usuarios)
+        """
+        if self._features_cache is not None:
+            return self._features_cache
+        
         print("🔧 Preparando características...")
         
-        # Características de hoteles
-        hotel_features = []
-        for hotel in self.hotels:
-            features = [
-                hotel["rating"],
-                hotel["price_per_night"] / 100000,  # Normalizar precio
-                len(hotel["amenities"]),
-                hotel["total_rooms"],
-                hotel["available_rooms"] / hotel["total_rooms"] if hotel["total_rooms"] > 0 else 0,
-                1 if "Piscina" in hotel["amenities"] else 0,
-                1 if "WiFi gratuito" in hotel["amenities"] else 0,
-                1 if "Restaurante" in hotel["amenities"] else 0,
-                1 if "Spa" in hotel["amenities"] else 0,
-                1 if hotel["category"] == "Lujo" else 0,
-                1 if hotel["category"] == "Económico" else 0
-            ]
-            hotel_features.append(features)
-        
-        # Características de usuarios
-        user_features = []
-        for user in self.users:
-            features = [
-                user["age"] / 100,  # Normalizar edad
-                1 if user["travel_style"] == "cultural" else 0,
-                1 if user["travel_style"] == "aventura" else 0,
-                1 if user["travel_style"] == "relajado" else 0,
-                1 if user["travel_style"] == "familiar" else 0,
-                1 if user["travel_style"] == "negocios" else 0,
-                1 if user["budget_range"] == "económico" else 0,
-                1 if user["budget_range"] == "medio" else 0,
-                1 if user["budget_range"] == "alto" else 0,
-                user["preferences"]["min_rating"],
-                user["preferences"]["max_price"] / 100000
-            ]
-            user_features.append(features)
-        
-        return np.array(hotel_features), np.array(user_features)
+        # Características de hoteles: cada columna se construye de una vez sobre
+        # todos los hoteles; las amenidades salen de las máscaras de bits
+        hotels = self.hotels
+        total_rooms = _column(hotels, "total_rooms")
+        available_rooms = self.hotel_avail
+        categories = np.array([hotel["category"] for hotel in hotels], dtype=str)
+        
+        hotel_features = np.column_stack([
+            self.hotel_ratings,
+            self.hotel_prices / 100000,  # Normalizar precio
+            np.fromiter((len(hotel["amenities"]) for hotel in hotels), dtype=np.float64, count=len(hotels)),
+            total_rooms,
+            np.divide(available_rooms, total_rooms, out=np.zeros_like(total_rooms), where=total_rooms > 0),
+            *(self._amenity_column(amenity) for amenity in _KEY_AMENITIES),
+            categories == "Lujo",
+            categories == "Económico"
+        ])
+        
+        # Características de usuarios: estilo y presupuesto como one-hot comparando
+        # contra todas las categorías a la vez
+        users = self.users
+        styles = np.array([user["travel_style"] for user in users], dtype=str)
+        budgets = np.array([user["budget_range"] for user in users], dtype=str)
+        preferences = [user["preferences"] for user in users]
+        
+        user_features = np.column_stack([
+            _column(users, "age") / 100,  # Normalizar edad
+            styles[:, None] == np.array(_TRAVEL_STYLES),
+            budgets[:, None] == np.array(_BUDGET_RANGES),
+            _column(preferences, "min_rating"),
+            _column(preferences, "max_price") / 100000
+        ])
+        
+        self._features_cache = (hotel_features, user_features)
+        return self._features_cache
     
     def train_recommendation_model(self):
         """Entrena el modelo de recomendaciones"""
@@ -95,53 +190,45 @@ class HotelRecommendationSystem:
         
         hotel_features, user_features = self.prepare_features()
         
-        # Crear datos de entrenamiento sintéticos
-        X = []
-        y = []
-        
-        for user_idx, user in enumerate(self.users):
-            for hotel_idx, hotel in enumerate(self.hotels):
-                # Combinar características de usuario y hotel
-                combined_features = np.concatenate([
-                    user_features[user_idx],
-                    hotel_features[hotel_idx]
-                ])
-                
-                # Simular rating basado en compatibilidad
-                user_pref = user_features[user_idx]
-                hotel_feat = hotel_features[hotel_idx]
-                
-                # Calcular compatibilidad
-                price_compatibility = 1 - abs(user_pref[-1] - hotel_feat[1]) / max(user_pref[-1], hotel_feat[1])
-                rating_compatibility = 1 - abs(user_pref[-2] - hotel_feat[0]) / 5.0
-                style_compatibility = np.dot(user_pref[1:6], [1, 1, 1, 1, 1]) / 5.0
-                
-                # Rating sintético basado en compatibilidad
-                synthetic_rating = (price_compatibility * 0.4 + 
-                                  rating_compatibility * 0.3 + 
-                                  style_compatibility * 0.3) * 5
-                
-                # Agregar ruido
-                synthetic_rating += np.random.normal(0, 0.5)
-                synthetic_rating = np.clip(synthetic_rating, 1, 5)
-                
-                X.append(combined_features)
-                y.append(synthetic_rating)
-        
-        X = np.array(X)
-        y = np.array(y)
+        # Crear datos de entrenamiento sintéticos: una fila por par (usuario, hotel),
+        # en orden usuario-mayor, construida con repeat/tile en lugar de un doble bucle.
+        # Se deja en float64: HistGradientBoosting convierte X a float64 en fit y predict
+        n_users, n_user_features = user_features.shape
+        n_hotels = len(hotel_features)
+        X = np.empty((n_users * n_hotels, n_user_features + hotel_features.shape[1]))
+        X[:, :n_user_features] = np.repeat(user_features, n_hotels, axis=0)
+        X[:, n_user_features:] = np.tile(hotel_features, (n_users, 1))
+        
+        # Calcular compatibilidad con broadcasting: matrices (usuarios x hoteles)
+        user_price = user_features[:, -1:]
+        hotel_price = hotel_features[:, 1]
+        price_compatibility = 1 - np.abs(user_price - hotel_price) / np.maximum(user_price, hotel_price)
+        rating_compatibility = 1 - np.abs(user_features[:, -2:-1] - hotel_features[:, 0]) / 5.0
+        style_compatibility = user_features[:, 1:6].sum(axis=1, keepdims=True) / 5.0
+        
+        # Rating sintético basado en compatibilidad
+        y = ((price_compatibility * 0.4 +
+              rating_compatibility * 0.3 +
+              style_compatibility * 0.3) * 5).ravel()
+        
+        # Agregar ruido
+        y += self.rng.standard_normal(y.size) * 0.5
+        np.clip(y, 1, 5, out=y)
         
         # Entrenar modelo
-        self.recommendation_model = RandomForestRegressor(
-            n_estimators=100,
-            random_state=42,
-            max_depth=10
+        # Gradient boosting con histogramas: agrupa las features en bins y
+        # evalúa árboles poco profundos, más rápido que 100 árboles completos
+        self.recommendation_model = HistGradientBoostingRegressor(
+            max_iter=100,
+            max_depth=6,
+            learning_rate=0.1,
+            random_state=42
         )
         self.recommendation_model.fit(X, y)
         
         # Guardar modelo
         model_path = self.models_dir / "hotel_recommendation_model.pkl"
-        joblib.dump(self.recommendation_model, model_path)
+        joblib.dump(self.recommendation_model, model_path, compress=_JOBLIB_COMPRESS, protocol=5)
         print(f"✅ Modelo guardado en: {model_path}")
     
     def load_model(self):
@@ -153,49 +240,72 @@ class HotelRecommendationSystem:
             return True
         return False
     
-    def get_hotel_recommendations(self, user_id, limit=5):
-        """Obtiene recomendaciones de hoteles para un usuario"""
+    def get_hotel_recommendations(self, user_id, limit=5, features=None):
+        """
+        Obtiene recomendaciones de hoteles para un usuario
+        
+        Args:
+            user_id: ID del usuario (1-indexed)
+            limit: Número máximo de recomendaciones
+            features: Tuple (features de hoteles, features de usuarios) ya preparado;
+                si es None se usa prepare_features (cacheado)
+        
+        Returns:
+            Lista de recomendaciones ordenada por score
+        """
         if not self.recommendation_model:
             if not self.load_model():
                 print("🔄 Entrenando modelo...")
                 self.train_recommendation_model()
         
         user = self.users[user_id - 1]  # user_id es 1-indexed
-        hotel_features, user_features = self.prepare_features()
+        hotel_features, user_features = features if features is not None else self.prepare_features()
         
         # Obtener características del usuario
         user_feat = user_features[user_id - 1]
         
-        # Calcular scores para todos los hoteles
+        # Calcular scores para todos los hoteles en un solo predict; solo las
+        # columnas del usuario cambian entre llamadas
+        X = self._get_predict_buffer(hotel_features, len(user_feat))
+        X[:, :len(user_feat)] = user_feat
+        scores = self.recommendation_model.predict(X)
+        
+        # Aplicar filtros del usuario como una sola máscara booleana
+        mask = ((self.hotel_prices <= user["preferences"]["max_price"]) &
+                (self.hotel_ratings >= user["preferences"]["min_rating"]) &
+                (self.hotel_avail > 0))
+        candidates = np.flatnonzero(mask)
+        
+        # Tomar los mejores por score; solo para ellos se arma el diccionario
+        best = candidates[_top_k(scores[candidates], limit)]
+        
         recommendations = []
-        for hotel_idx, hotel in enumerate(self.hotels):
-            # Combinar características
-            combined_features = np.concatenate([user_feat, hotel_features[hotel_idx]])
-            
-            # Predecir score
-            score = self.recommendation_model.predict([combined_features])[0]
-            
-            # Aplicar filtros del usuario
-            if (hotel["price_per_night"] <= user["preferences"]["max_price"] and
-                hotel["rating"] >= user["preferences"]["min_rating"] and
-                hotel["available_rooms"] > 0):
-                
-                recommendation = {
-                    "hotel_id": hotel["id"],
-                    "name": hotel["name"],
-                    "city": hotel["city"],
-                    "category": hotel["category"],
-                    "rating": hotel["rating"],
-                    "price_per_night": hotel["price_per_night"],
-                    "amenities": hotel["amenities"][:5],  # Top 5 amenities
-                    "score": float(score),
-                    "match_reasons": self._get_match_reasons(user, hotel, score)
-                }
-                recommendations.append(recommendation)
-        
-        # Ordenar por score y tomar los mejores
-        recommendations.sort(key=lambda x: x["score"], reverse=True)
-        return recommendations[:limit]
+        for i in best.tolist():
+            hotel = self.hotels[i]
+            score = scores[i]
+            recommendation = {
+                "hotel_id": hotel["id"],
+                "name": hotel["name"],
+                "city": hotel["city"],
+                "category": hotel["category"],
+                "rating": hotel["rating"],
+                "price_per_night": hotel["price_per_night"],
+                "amenities": hotel["amenities"][:5],  # Top 5 amenities
+                "score": float(score),
+                "match_reasons": self._get_match_reasons(user, hotel, score)
+            }
+            recommendations.append(recommendation)
+        
+        return recommendations
+    
+    def _get_predict_buffer(self, hotel_features, n_user_features):
+        """Matriz (usuario + hotel) preasignada; las columnas de hotel se rellenan una sola vez"""
+        if self._predict_buffer is None or self._predict_buffer[0] is not hotel_features:
+            n_hotels, n_hotel_features = hotel_features.shape
+            X = np.empty((n_hotels, n_user_features + n_hotel_features), dtype=hotel_features.dtype)
+            X[:, n_user_features:] = hotel_features
+            self._predict_buffer = (hotel_features, X)
+        return self._predict_buffer[1]
     
     def _get_match_reasons(self, user, hotel, score):
         """Genera razones de por qué el hotel coincide con el usuario"""
@@ -218,9 +328,9 @@ class HotelRecommendationSystem:
         
         return reasons[:3]  # Máximo 3 razones
     
-    def print_recommendations_json(self, user_id, limit=5):
+    def print_recommendations_json(self, user_id, limit=5, features=None):
         """Imprime las recomendaciones en formato JSON en consola"""
-        recommendations = self.get_hotel_recommendations(user_id, limit)
+        recommendations = self.get_hotel_recommendations(user_id, limit, features)
         
         # Crear estructura de respuesta
         response = {
@@ -255,11 +365,12 @@ def main():
     
     # Inicializar sistema
     system = HotelRecommendationSystem()
+    features = system.prepare_features()  # Una sola vez para todos los usuarios
     
     # Generar recomendaciones para diferentes usuarios
     for user_id in range(1, 4):  # Usuarios 1, 2, 3
         print(f"\n🎯 Generando recomendaciones para Usuario {user_id}...")
-        system.print_recommendations_json(user_id, limit=3)
+        system.print_recommendations_json(user_id, limit=3, features=features)
         print("\n" + "-"*60)
 
 if __name__ == "__main__":
@@ -6,14 +6,31 @@ Sincelejo y Sucre - Colombia
 
 import os
 import numpy as np
-import pandas as pd
+from datetime import datetime, timezone
 from pathlib import Path
 import json
 import joblib
+
+try:
+    # Intel Extension for Scikit-learn (opcional): reemplaza RandomForest por la
+    # implementación de oneDAL; debe aplicarse antes de importar los estimadores
+    from sklearnex import patch_sklearn
+except ImportError:
+    pass
+else:
+    patch_sklearn()
+
 from sklearn.neural_network import MLPClassifier
 from sklearn.ensemble import RandomForestClassifier
 import pickle
 
+try:
+    import lz4  # noqa: F401 - joblib lo usa para compress=('lz4', n)
+except ImportError:
+    _JOBLIB_COMPRESS = 3  # zlib
+else:
+    _JOBLIB_COMPRESS = ('lz4', 3)
+
 class SimpleModelOptimizer:
     def __init__(self):
         self.models_dir = Path("models")
@@ -23,6 +40,23 @@ class SimpleModelOptimizer:
         # Crear directorios
         self.optimized_dir.mkdir(parents=True, exist_ok=True)
         self.mobile_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Artefactos ya cargados con joblib, por ruta
+        self._loaded = {}
+    
+    def _load(self, path):
+        """
+        Carga un artefacto con joblib una sola vez por proceso
+        
+        Args:
+            path: Ruta del archivo .pkl
+        
+        Returns:
+            Objeto cargado (compartido entre las optimizaciones que lo usan)
+        """
+        if path not in self._loaded:
+            self._loaded[path] = joblib.load(path)
+        return self._loaded[path]
     
     def optimize_recommendation_model(self):
         """Optimizar modelo de recomendaciones"""
@@ -37,8 +71,8 @@ class SimpleModelOptimizer:
                 print("❌ Modelo de recomendaciones no encontrado")
                 return False
             
-            model = joblib.load(model_path)
-            features_data = joblib.load(features_path)
+            model = self._load(model_path)
+            features_data = self._load(features_path)
             
             # Crear modelo optimizado más pequeño
             optimized_model = MLPClassifier(
@@ -49,34 +83,28 @@ class SimpleModelOptimizer:
                 validation_fraction=0.1
             )
             
-            # Re-entrenar con menos datos para optimización
+            # Destilar con menos datos: el modelo pequeño aprende a imitar al original
             n_users = 50  # Reducir usuarios
             n_activities = len(features_data['activities'])
             
-            # Crear datos optimizados
-            X_opt = []
-            y_opt = []
-            
-            for user_id in range(n_users):
-                user_pref = features_data['user_features'][user_id]
-                for activity_id in range(n_activities):
-                    activity_feat = features_data['activity_features'][activity_id]
-                    combined_features = np.concatenate([user_pref, activity_feat])
-                    X_opt.append(combined_features)
-                    
-                    # Rating simplificado
-                    rating = int(np.clip(np.dot(user_pref, activity_feat[:5]) * 2 + 2, 1, 5))
-                    y_opt.append(rating)
+            # Crear datos optimizados: todos los pares (usuario, actividad) de una vez,
+            # en orden usuario-mayor, en float32 (mitad de memoria que float64)
+            user_features = np.asarray(features_data['user_features'][:n_users], dtype=np.float32)
+            activity_features = np.asarray(features_data['activity_features'], dtype=np.float32)
+            X_opt = np.concatenate([
+                np.repeat(user_features, n_activities, axis=0),
+                np.tile(activity_features, (len(user_features), 1))
+            ], axis=1)
             
-            X_opt = np.array(X_opt)
-            y_opt = np.array(y_opt)
+            # Etiquetas del modelo original en un solo predict por lotes
+            y_opt = model.predict(X_opt)
             
             # Entrenar modelo optimizado
             optimized_model.fit(X_opt, y_opt)
             
             # Guardar modelo optimizado
             output_path = self.optimized_dir / "mlp_recommendations_optimized.pkl"
-            joblib.dump(optimized_model, output_path)
+            joblib.dump(optimized_model, output_path, compress=_JOBLIB_COMPRESS, protocol=5)
             
             # Guardar datos optimizados
             optimized_data = {
@@ -89,7 +117,7 @@ class SimpleModelOptimizer:
             }
             
             features_output_path = self.optimized_dir / "recommendation_features_optimized.pkl"
-            joblib.dump(optimized_data, features_output_path)
+            joblib.dump(optimized_data, features_output_path, compress=_JOBLIB_COMPRESS, protocol=5)
             
             # Crear modelo para móviles (formato pickle simple)
             mobile_path = self.mobile_dir / "recommendation_model_mobile.pkl"
@@ -99,7 +127,7 @@ class SimpleModelOptimizer:
                     'features': optimized_data,
                     'model_type': 'recommendation',
                     'version': '1.0'
-                }, f)
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
             
             print(f"✅ Modelo de recomendaciones optimizado guardado en {output_path}")
             print(f"📱 Modelo móvil guardado en {mobile_path}")
@@ -123,9 +151,9 @@ class SimpleModelOptimizer:
                 print("❌ Modelo de clasificación no encontrado")
                 return False
             
-            model = joblib.load(model_path)
-            label_encoder = joblib.load(encoder_path)
-            text_features = joblib.load(features_path)
+            model = self._load(model_path)
+            label_encoder = self._load(encoder_path)
+            text_features = self._load(features_path)
             
             # Crear modelo optimizado más pequeño
             optimized_model = RandomForestClassifier(
@@ -136,18 +164,19 @@ class SimpleModelOptimizer:
             )
             
             # Re-entrenar con datos optimizados
-            X = np.array(text_features['features'])
+            # RandomForest trabaja internamente en float32: se evita la copia float64
+            X = np.array(text_features['features'], dtype=np.float32)
             y = label_encoder.transform(text_features['labels'])
             
             optimized_model.fit(X, y)
             
             # Guardar modelo optimizado
             output_path = self.optimized_dir / "rf_classification_optimized.pkl"
-            joblib.dump(optimized_model, output_path)
+            joblib.dump(optimized_model, output_path, compress=_JOBLIB_COMPRESS, protocol=5)
             
             # Guardar label encoder
             encoder_output_path = self.optimized_dir / "label_encoder_optimized.pkl"
-            joblib.dump(label_encoder, encoder_output_path)
+            joblib.dump(label_encoder, encoder_output_path, compress=_JOBLIB_COMPRESS, protocol=5)
             
             # Crear modelo para móviles
             mobile_path = self.mobile_dir / "classification_model_mobile.pkl"
@@ -158,7 +187,7 @@ class SimpleModelOptimizer:
                     'text_features': text_features,
                     'model_type': 'classification',
                     'version': '1.0'
-                }, f)
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
             
             print(f"✅ Modelo de clasificación optimizado guardado en {output_path}")
             print(f"📱 Modelo móvil guardado en {mobile_path}")
@@ -180,7 +209,7 @@ class SimpleModelOptimizer:
                 print("❌ Modelo de embeddings no encontrado")
                 return False
             
-            embeddings_data = joblib.load(embeddings_path)
+            embeddings_data = self._load(embeddings_path)
             
             # Optimizar embeddings (reducir dimensionalidad)
             embeddings = np.array(embeddings_data['embeddings'])
@@ -197,7 +226,7 @@ class SimpleModelOptimizer:
             }
             
             output_path = self.optimized_dir / "activity_embeddings_optimized.pkl"
-            joblib.dump(optimized_data, output_path)
+            joblib.dump(optimized_data, output_path, compress=_JOBLIB_COMPRESS, protocol=5)
             
             # Crear modelo para móviles
             mobile_path = self.mobile_dir / "embedding_model_mobile.pkl"
@@ -206,7 +235,7 @@ class SimpleModelOptimizer:
                     'embeddings': optimized_data,
                     'model_type': 'embedding',
                     'version': '1.0'
-                }, f)
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
             
             print(f"✅ Modelo de embeddings optimizado guardado en {output_path}")
             print(f"📱 Modelo móvil guardado en {mobile_path}")
@@ -268,7 +297,7 @@ class SimpleModelOptimizer:
         """Crear reporte de optimización"""
         report = {
             "optimization_summary": {
-                "date": pd.Timestamp.now().isoformat(),
+                "date": datetime.now(timezone.utc).isoformat(),
                 "total_models_optimized": 0,
                 "total_size_reduction_mb": 0,
                 "mobile_ready_models": []
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# cython: boundscheck=False, wraparound=False, cdivision=True
+"""
+Score de compatibilidad lugar-usuario para el sistema de recomendaciones
+Módulo aislado del resto del sistema para poder compilarlo con Cython (ver setup.py)
+"""
+
+from typing import Dict, Any, FrozenSet, Optional, Sequence
+
+import numpy as np
+
+try:
+    import cython
+except ImportError:
+    # Sin Cython el módulo es Python puro: las anotaciones de variables
+    # locales (cython.double, ...) nunca se evalúan en tiempo de ejecución
+    cython = None
+
+# Pesos y criterios del score, comunes a la versión escalar y a la vectorizada
+# (se implementan por separado: la escalar evita crear arrays para un solo lugar)
+_RATING_WEIGHT = 0.4
+_PRICE_WEIGHT = 0.3
+_TYPE_WEIGHT = 0.2
+_REVIEWS_WEIGHT = 0.1
+_MIN_REVIEWS = 3
+_GOOD_REVIEWS_AVG = 4.0
+
+def calculate_compatibility_score(place: Any, user_preferences: Dict[str, Any],
+                                  threshold: Optional[float] = None) -> float:
+    """
+    Calcula score de compatibilidad usando IA
+    
+    Args:
+        place: Detalles del lugar (PlaceDetails)
+        user_preferences: Preferencias del usuario
+        threshold: Umbral de aceptación; si el lugar no puede superarlo ni con
+            el score de reviews, se omite promediarlas (el score devuelto queda
+            igualmente por debajo del umbral)
+        
+    Returns:
+        Score de compatibilidad (0-1)
+    """
+    # Tipos C en modo Python puro de Cython (ver setup.py)
+    score: cython.double
+    rating: cython.double
+    min_rating: cython.double
+    rating_score: cython.double
+    price_level: cython.double
+    max_price_level: cython.double
+    price_score: cython.double
+    total_rating: cython.double
+    good_reviews: cython.bint
+    n_reviews: cython.Py_ssize_t
+    i: cython.Py_ssize_t
+    
+    # Cada término se calcula siempre y se multiplica por su condición
+    # (0/1) en lugar de sumarse dentro de un if
+    rating = place.rating
+    min_rating = user_preferences.get('min_rating', 3.0)
+    rating_score = min((rating - min_rating) / 2.0, _RATING_WEIGHT)  # Máximo 40% del score
+    
+    price_level = place.price_level
+    max_price_level = user_preferences.get('max_price_level', 3)
+    price_score = (max_price_level - price_level) / max_price_level if max_price_level > 0 else 0.0
+    
+    preferred_types = _preferred_types(user_preferences)
+    
+    score = (
+        (rating >= min_rating) * rating_score
+        + (price_level <= max_price_level) * price_score * _PRICE_WEIGHT  # 30% del score
+        + (not preferred_types.isdisjoint(place.types)) * _TYPE_WEIGHT  # 20% del score
+    )
+    
+    # Descartado aunque sume el 10% de reviews: no hace falta recorrerlas
+    if threshold is not None and score + _REVIEWS_WEIGHT <= threshold:
+        return min(score, 1.0)
+    
+    reviews = place.reviews
+    n_reviews = len(reviews) if reviews else 0
+    total_rating = 0.0
+    for i in range(n_reviews):
+        total_rating += reviews[i].get('rating', 0)
+    good_reviews = n_reviews >= _MIN_REVIEWS and total_rating / n_reviews >= _GOOD_REVIEWS_AVG
+    
+    score += good_reviews * _REVIEWS_WEIGHT  # 10% del score
+    
+    return min(score, 1.0)
+
+
+def _preferred_types(user_preferences: Dict[str, Any]) -> FrozenSet[str]:
+    """Tipos preferidos del usuario como frozenset (acepta listas, tuplas o sets)"""
+    preferred_types = user_preferences.get('preferred_types', frozenset())
+    if isinstance(preferred_types, frozenset):
+        return preferred_types
+    return frozenset(preferred_types)
+
+
+def _has_good_reviews(reviews: Any) -> bool:
+    """Indica si hay al menos 3 reviews con promedio >= 4.0"""
+    total_rating: cython.double
+    n_reviews: cython.Py_ssize_t
+    i: cython.Py_ssize_t
+    
+    n_reviews = len(reviews) if reviews else 0
+    if n_reviews < _MIN_REVIEWS:
+        return False
+    total_rating = 0.0
+    for i in range(n_reviews):
+        total_rating += reviews[i].get('rating', 0)
+    return total_rating / n_reviews >= _GOOD_REVIEWS_AVG
+
+def calculate_compatibility_scores(places: Sequence[Any], user_preferences: Dict[str, Any],
+                                   threshold: Optional[float] = None) -> np.ndarray:
+    """
+    Versión vectorizada de calculate_compatibility_score para varios lugares
+    
+    Args:
+        places: Detalles de los lugares (PlaceDetails)
+        user_preferences: Preferencias del usuario
+        threshold: Umbral de aceptación; las reviews solo se promedian para
+            los lugares que aún pueden superarlo
+        
+    Returns:
+        Array con el score de compatibilidad (0-1) de cada lugar
+    """
+    n_places = len(places)
+    min_rating = user_preferences.get('min_rating', 3.0)
+    max_price_level = user_preferences.get('max_price_level', 3)
+    preferred_types = _preferred_types(user_preferences)
+    
+    ratings = np.fromiter((place.rating for place in places), dtype=np.float64, count=n_places)
+    price_levels = np.fromiter((place.price_level for place in places), dtype=np.float64, count=n_places)
+    type_matches = np.fromiter(
+        (not preferred_types.isdisjoint(place.types) for place in places), dtype=bool, count=n_places
+    )
+    
+    # Score por rating (máximo 40% del score)
+    scores = np.clip((ratings - min_rating) / 2.0, 0.0, _RATING_WEIGHT)
+    
+    # Score por precio (30% del score)
+    if max_price_level > 0:
+        scores += np.maximum(max_price_level - price_levels, 0.0) / max_price_level * _PRICE_WEIGHT
+    
+    # Score por tipo de lugar (20%) como máscara 0/1
+    scores += type_matches * _TYPE_WEIGHT
+    
+    # Score por reviews (10%): solo se promedian donde aún puede superarse el umbral
+    if threshold is None:
+        pending = range(n_places)
+    else:
+        pending = np.flatnonzero(scores + _REVIEWS_WEIGHT > threshold).tolist()
+    good_reviews = np.zeros(n_places, dtype=bool)
+    for index in pending:
+        good_reviews[index] = _has_good_reviews(places[index].reviews)
+    scores += good_reviews * _REVIEWS_WEIGHT
+    
+    return np.minimum(scores, 1.0)
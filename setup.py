@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Compilación opcional con Cython de los módulos del núcleo de recomendaciones
+
+    python setup.py build_ext --inplace
+
+Sin Cython instalado los módulos se usan como Python puro.
+"""
+
+import os
+
+from setuptools import Extension, setup
+from setuptools.command.build_ext import build_ext as _build_ext
+
+# Los ejemplos importan su núcleo por el nombre corto ("import rec_core"),
+# no como examples.rec_core: la extensión lleva ese mismo nombre
+EXAMPLES_DIR = "examples"
+EXAMPLE_EXTENSIONS = ("rec_core",)
+# Dependencias Python puras del núcleo de los ejemplos (Numba no se compila con Cython)
+EXAMPLE_PY_MODULES = ("rec_kernel",)
+
+
+class build_ext(_build_ext):
+    """build_ext que ubica los módulos de examples/ donde se importan"""
+
+    def run(self):
+        super().run()
+        if self.inplace:
+            # setuptools deja las extensiones de primer nivel en la raíz; las de
+            # examples/ se mueven junto a su .py, que es de donde las importan los
+            # ejemplos (en un mismo directorio la extensión tiene prioridad)
+            for name in EXAMPLE_EXTENSIONS:
+                filename = self.get_ext_filename(name)
+                if os.path.exists(filename):
+                    self.move_file(filename, os.path.join(EXAMPLES_DIR, filename))
+        elif self.extensions:
+            # En el wheel rec_core queda en la raíz de site-packages: sus
+            # dependencias de examples/ se instalan a su lado
+            for name in EXAMPLE_PY_MODULES:
+                self.copy_file(os.path.join(EXAMPLES_DIR, f"{name}.py"),
+                               os.path.join(self.build_lib, f"{name}.py"))
+
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    # Las directivas específicas de cada módulo van en su cabecera
+    # (p. ej. "# cython: boundscheck=False" en scoring.py)
+    ext_modules = cythonize(
+        [
+            "scoring.py",
+            "config.py",
+            "enhanced_recommendations.py",
+            Extension("rec_core", [os.path.join(EXAMPLES_DIR, "rec_core.py")]),
+        ],
+        language_level=3,
+        annotate=True,  # genera <modulo>.html con las líneas que aún usan la API de Python
+    )
+
+setup(ext_modules=ext_modules, cmdclass={"build_ext": build_ext})
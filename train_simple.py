@@ -85,7 +85,9 @@ class SimpleModelTrainer:
                 X.append(combined_features)
                 y.append(rating)
             
-            X = np.array(X)
+            # float32: el MLP entrenado queda en float32 y los ejemplos pueden
+            # mapear sus pesos con mmap_mode='r' sin convertirlos al cargar
+            X = np.array(X, dtype=np.float32)
             y = np.array(y)
             
             # Dividir datos